@@ -5,15 +5,29 @@ This package provides functionality for tracking activities using natural langua
 processing and storing the data in Google Sheets.
 """
 
-__version__ = "0.1.0"
+from importlib import import_module
+from typing import Any
+
 
-from .activities.parser import OpenAIActivityParser
-from .activities.tracker import ActivityTracker
-from .sheets.client import GoogleSheetsClient
+__version__ = "0.1.0"
 
+# resolved on first access, so importing e.g. src.api doesn't pull in openai and googleapiclient
+_LAZY_EXPORTS = {
+    "ActivityTracker": ".activities.tracker",
+    "GoogleSheetsClient": ".sheets.client",
+    "OpenAIActivityParser": ".activities.parser",
+}
 
 __all__ = [
     "ActivityTracker",
     "GoogleSheetsClient",
     "OpenAIActivityParser",
 ]
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_LAZY_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -1,7 +1,14 @@
-import json
-from datetime import UTC, datetime, timedelta
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import UTC, date, datetime, timedelta
+from functools import lru_cache
 
-from openai import OpenAI
+import orjson
+from openai import AsyncOpenAI, OpenAI, OpenAIError
+
+
+logger = logging.getLogger(__name__)
 
 
 # class ActivityParser(Protocol):
@@ -12,15 +19,11 @@ from openai import OpenAI
 #         pass
 
 
-class OpenAIActivityParser:
-    def __init__(self, api_key: str, confidence_threshold: float = 0.7) -> None:
-        self.client = OpenAI(api_key=api_key)
-        self.confidence_threshold = confidence_threshold
-
-    def _generate_system_prompt(self, existing_activities: list[str]) -> str:
-        # ruff: noqa: E501
-        return f"""Extract activities, their durations, and dates from the message. Multiple activities may be mentioned.
-Existing activity categories are: {", ".join(existing_activities)}
+# ruff: noqa: E501
+# the static instructions lead the prompt so every request shares the same prefix, which OpenAI caches;
+# the user's categories and the threshold follow in a second, short system message
+_INSTRUCTIONS = """Extract activities, their durations, and dates from the message. Multiple activities may be mentioned.
+The existing activity categories are listed after these instructions.
 
 If a described activity closely matches an existing category, use that category.
 Always convert duration to hours (e.g., 30 minutes = 0.5 hours). If there is no concrete duration number in the input, estimate.
@@ -30,105 +33,203 @@ For dates:
 - For explicit dates like "January 9th", return as "MM/DD" format
 - If no date is mentioned, assume today (days_ago = 0)
 
-Examples:
+"""
+
+# one compact line per reply keeps the indentation out of every request; replies list every field, as the strict schema requires
+_EXAMPLES_BLOCK = """Examples:
 Input: "Yesterday I went for a run for 30 minutes"
-Response: {{
-    "activities": [
-        {{
-            "activity": "Running",
-            "duration": 0.5,
-            "confidence": 1.0,
-            "matched_category": "Running",
-            "days_ago": 1
-        }}
-    ]
-}}
+Response: {"activities": [{"activity": "Running", "duration": 0.5, "confidence": 1.0, "matched_category": "Running", "days_ago": 1, "date": null}]}
 
 Input: "On January 9th I meditated for 20 minutes and did yoga for 45 minutes"
-Response: {{
-    "activities": [
-        {{
-            "activity": "Meditation",
-            "duration": 0.33,
-            "confidence": 0.95,
-            "matched_category": "Meditation",
-            "date": "01/09"
-        }},
-        {{
-            "activity": "Yoga",
-            "duration": 0.75,
-            "confidence": 1.0,
-            "matched_category": "Yoga",
-            "date": "01/09"
-        }}
-    ]
-}}
+Response: {"activities": [{"activity": "Meditation", "duration": 0.33, "confidence": 0.95, "matched_category": "Meditation", "days_ago": null, "date": "01/09"}, {"activity": "Yoga", "duration": 0.75, "confidence": 1.0, "matched_category": "Yoga", "days_ago": null, "date": "01/09"}]}
 
 Input: "Last night I practiced guitar and this morning I went swimming"
-Response: {{
-    "activities": [
-        {{
-            "activity": "Guitar",
-            "duration": 1.0,
-            "confidence": 0.2,
-            "matched_category": null,
-            "days_ago": 1
-        }},
-        {{
-            "activity": "Swimming",
-            "duration": 0.5,
-            "confidence": 1.0,
-            "matched_category": "Swimming",
-            "days_ago": 0
-        }}
-    ]
-}}
-
-Return JSON with an "activities" array containing objects with:
-- activity: The activity name (use matched_category if confidence > {self.confidence_threshold})
+Response: {"activities": [{"activity": "Guitar", "duration": 1.0, "confidence": 0.2, "matched_category": null, "days_ago": 1, "date": null}, {"activity": "Swimming", "duration": 0.5, "confidence": 1.0, "matched_category": "Swimming", "days_ago": 0, "date": null}]}
+
+"""
+
+_RESPONSE_FORMAT = """Return JSON with an "activities" array containing objects with:
+- activity: The activity name (use matched_category if confidence is above the confidence threshold given below)
 - duration: Duration in hours (convert minutes to decimal hours)
 - confidence: How confident (0-1) this matches an existing category
 - matched_category: The existing category it matches, if any
 - days_ago: Integer for relative dates (today = 0, yesterday = 1, etc.)
-- date: "MM/DD" string for explicit dates (only include if an explicit date was given)"""
-
-    def parse_message(self, message: str, existing_activities: list[str]) -> list:
-        """Parse a natural language message into multiple activities and durations"""
-        response = self.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {
-                    "role": "system",
-                    "content": self._generate_system_prompt(existing_activities),
+- date: "MM/DD" string for explicit dates (null unless an explicit date was given)"""
+
+# strict structured output: every field is required, optional ones are nullable
+PARSE_SCHEMA = {
+    "name": "activities",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "activities": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "activity": {"type": "string"},
+                        "duration": {"type": "number"},
+                        "confidence": {"type": "number"},
+                        "matched_category": {"type": ["string", "null"]},
+                        "days_ago": {"type": ["integer", "null"]},
+                        "date": {"type": ["string", "null"]},
+                    },
+                    "required": ["activity", "duration", "confidence", "matched_category", "days_ago", "date"],
+                    "additionalProperties": False,
                 },
+            },
+        },
+        "required": ["activities"],
+        "additionalProperties": False,
+    },
+}
+
+
+_STATIC_SYSTEM_PROMPT = _INSTRUCTIONS + _EXAMPLES_BLOCK + _RESPONSE_FORMAT
+
+
+@lru_cache(maxsize=8)
+def _build_context_prompt(existing_activities: tuple[str, ...], confidence_threshold: float) -> str:
+    """Render the per-user part of the system prompt; the activity list and threshold rarely change"""
+    return (
+        f"Existing activity categories are: {', '.join(existing_activities)}\n"
+        f"Confidence threshold: {confidence_threshold}"
+    )
+
+
+# parsers built with the same key share one client, and with it one keep-alive connection pool,
+# so constructing a parser per request doesn't pay a fresh TLS handshake to the API
+@lru_cache(maxsize=4)
+def _openai_client(api_key: str) -> OpenAI:
+    return OpenAI(api_key=api_key)
+
+
+@lru_cache(maxsize=4)
+def _async_openai_client(api_key: str) -> AsyncOpenAI:
+    return AsyncOpenAI(api_key=api_key)
+
+
+class OpenAIActivityParser:
+    def __init__(
+        self,
+        api_key: str,
+        confidence_threshold: float = 0.7,
+        max_concurrent_requests: int = 5,
+        model: str = "gpt-4o-mini",
+        response_cache_size: int = 4096,
+    ) -> None:
+        self.client = _openai_client(api_key)
+        self.async_client = _async_openai_client(api_key)
+        self.confidence_threshold = confidence_threshold
+        self.model = model
+        # bounds in-flight requests from parse_messages and concurrent handlers to stay within rate limits
+        self._request_slots = asyncio.Semaphore(max_concurrent_requests)
+        # raw completions keyed on the message and categories; dates are resolved on every hit so
+        # "yesterday" stays relative to the day the message arrives
+        self._response_cache: OrderedDict[tuple, str] = OrderedDict()
+        self.response_cache_size = response_cache_size
+
+    async def warm_up_async(self) -> None:
+        """Open the async client's connection to the API before the first message needs it"""
+        try:
+            await self.async_client.models.retrieve(self.model)
+        except OpenAIError:
+            logger.warning("Could not warm up the OpenAI connection", exc_info=True)
+
+    def _generate_context_prompt(self, existing_activities: list[str]) -> str:
+        return _build_context_prompt(tuple(sorted(existing_activities)), self.confidence_threshold)
+
+    def _completion_kwargs(self, message: str, existing_activities: list[str]) -> dict:
+        """Build the chat completion request for a message"""
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": _STATIC_SYSTEM_PROMPT},
+                {"role": "system", "content": self._generate_context_prompt(existing_activities)},
                 {"role": "user", "content": message},
             ],
-            response_format={"type": "json_object"},
-        )
-        response_content = response.choices[0].message.content
-        if response_content is None:
-            raise ValueError("OpenAI response content is None")
-        result = json.loads(response_content)
-
-        processed_activities = []
-        current_date = datetime.now(tz=UTC).date()
-        for activity_data in result["activities"]:
-            if activity_data.get("matched_category") and activity_data.get("confidence", 0) > self.confidence_threshold:
-                activity_data["activity"] = activity_data["matched_category"]
-
-            if "date" in activity_data:
-                month, day = map(int, activity_data["date"].split("/"))
-                activity_date = current_date.replace(month=month, day=day)
-            else:  # time delta
-                days_ago = activity_data.get("days_ago", 0)
-                activity_date = current_date - timedelta(days=days_ago)
-
-            processed_activities.append(
-                {
-                    "activity": activity_data["activity"],
-                    "duration": activity_data["duration"],
-                    "date": activity_date,
-                }
+            "response_format": {"type": "json_schema", "json_schema": PARSE_SCHEMA},
+        }
+
+    def _response_cache_key(self, message: str, existing_activities: list[str]) -> tuple:
+        return (message.strip(), tuple(sorted(existing_activities)), self.confidence_threshold, self.model)
+
+    def _cache_response(self, key: tuple, content: str) -> None:
+        self._response_cache[key] = content
+        if len(self._response_cache) > self.response_cache_size:
+            self._response_cache.popitem(last=False)
+
+    def _cached_response(self, key: tuple) -> str | None:
+        if key not in self._response_cache:
+            return None
+        self._response_cache.move_to_end(key)
+        return self._response_cache[key]
+
+    def parse_message(self, message: str, existing_activities: list[str]) -> list:
+        """Parse a natural language message into multiple activities and durations"""
+        key = self._response_cache_key(message, existing_activities)
+        content = self._cached_response(key)
+        if content is not None:
+            return self._process_response(content)
+        response = self.client.chat.completions.create(**self._completion_kwargs(message, existing_activities))
+        content = response.choices[0].message.content
+        activities = self._process_response(content)
+        # only a reply that parsed is kept, so an empty or malformed one is retried on the next send
+        self._cache_response(key, content)
+        return activities
+
+    async def parse_message_async(self, message: str, existing_activities: list[str]) -> list:
+        """Parse a message without blocking the event loop"""
+        key = self._response_cache_key(message, existing_activities)
+        content = self._cached_response(key)
+        if content is not None:
+            return self._process_response(content)
+        async with self._request_slots:
+            response = await self.async_client.chat.completions.create(
+                **self._completion_kwargs(message, existing_activities)
             )
+        content = response.choices[0].message.content
+        activities = self._process_response(content)
+        self._cache_response(key, content)
+        return activities
+
+    async def parse_messages(self, messages: list[str], existing_activities: list[str]) -> list[list]:
+        """Parse several messages concurrently, returning their activities in message order"""
+        return await asyncio.gather(*(self.parse_message_async(message, existing_activities) for message in messages))
 
-        return processed_activities
+    def _process_response(self, response_content: str | None, current_date: date | None = None) -> list:
+        """Turn the model's JSON reply into activities with resolved dates"""
+        if response_content is None:
+            raise ValueError("OpenAI response content is None")
+        result = orjson.loads(response_content)
+
+        # resolved once, so every activity of the reply is dated against the same day
+        current_date = current_date or datetime.now(tz=UTC).date()
+        activities = (self._process_activity(activity_data, current_date) for activity_data in result["activities"])
+        return [activity for activity in activities if activity is not None]
+
+    def _process_activity(self, activity_data: dict, current_date: date) -> dict | None:
+        """Resolve one activity from the model's reply to its category and date, or None if its date is invalid"""
+        if activity_data.get("matched_category") and activity_data.get("confidence", 0) > self.confidence_threshold:
+            activity_data["activity"] = activity_data["matched_category"]
+
+        if activity_data.get("date"):
+            month, day = map(int, activity_data["date"].split("/"))
+            try:
+                activity_date = date(current_date.year, month, day)
+            except ValueError:
+                # e.g. "02/29" outside a leap year; the message's other activities are still recorded
+                logger.warning(
+                    f"Skipping {activity_data['activity']}: {activity_data['date']} is not a date in {current_date.year}"
+                )
+                return None
+        else:  # time delta
+            days_ago = activity_data.get("days_ago") or 0
+            activity_date = current_date - timedelta(days=days_ago) if days_ago else current_date
+
+        return {
+            "activity": activity_data["activity"],
+            "duration": activity_data["duration"],
+            "date": activity_date,
+        }
@@ -1,10 +1,19 @@
+import asyncio
 import logging
+import sqlite3
+import threading
+from collections.abc import Generator
+from contextlib import contextmanager
 from datetime import UTC, date, datetime
+from typing import ClassVar
+
+import psycopg2
 
 from src.activities.parser import OpenAIActivityParser
-from src.db.client import SQLiteClient
+from src.db.client import Entry, SQLiteClient
 from src.db.postgres_client import PostgresClient
-from src.sheets.client import GoogleSheetsClient
+from src.sheets.client import GoogleSheetsClient, column_letter, format_sheet_date, row_range
+from src.sheets.models import SheetState
 
 
 logger = logging.getLogger(__name__)
@@ -13,6 +22,10 @@ logger = logging.getLogger(__name__)
 class ActivityTracker:
     """Main class for tracking activities"""
 
+    # (spreadsheet id, sheet name, year) already checked in this process, so trackers built
+    # per request don't re-probe the sheets; a fresh client reads the date rows lazily instead
+    _initialized: ClassVar[set[tuple[str, str, int]]] = set()
+
     def __init__(
         self,
         sheets_client: GoogleSheetsClient,
@@ -26,85 +39,200 @@ class ActivityTracker:
         self.year = year or datetime.now(tz=UTC).year
         self.db_client = db_client
         self.user_sheet_mapping = user_sheet_mapping
-        for sheet_name in set(user_sheet_mapping.values()):
-            self.sheets_client.initialize_year_structure(sheet_name, self.year)
+        self._sheet_state: SheetState | None = None
+        # parsing may overlap across threads, but the sheets service and the batch state may not
+        self._write_lock = threading.Lock()
+        # the header only changes when the tracker itself adds an activity column
+        self._header_cache: dict[str, list[str]] = {}
+        self._initialize_sheets()
+
+    def _initialize_sheets(self) -> None:
+        """Check the year structure of each mapped sheet the first time this process sees it"""
+        keys = {
+            (self.sheets_client.spreadsheet_id, sheet_name, self.year)
+            for sheet_name in self.user_sheet_mapping.values()
+        }
+        pending = keys - self._initialized
+        if not pending:
+            return
+        self.sheets_client.initialize_year_structures(sorted(sheet_name for _, sheet_name, _ in pending), self.year)
+        self._initialized.update(pending)
 
     def track_activity(self, telegram_user_id: int, message: str) -> None:
         """Track a new activity from a natural language message"""
+        sheet_name, db_user_id, existing_categories = self._resolve_user(telegram_user_id)
+        activities = self.activity_parser.parse_message(message, existing_categories)
+        self._record_activities(sheet_name, db_user_id, message, activities)
+
+    async def track_activity_async(self, telegram_user_id: int, message: str) -> None:
+        """Track a new activity without blocking the event loop on the parser, database or sheet"""
+        sheet_name, db_user_id, existing_categories = await asyncio.to_thread(self._resolve_user, telegram_user_id)
+        activities = await self.activity_parser.parse_message_async(message, existing_categories)
+        await asyncio.to_thread(self._record_activities, sheet_name, db_user_id, message, activities)
+
+    def _resolve_user(self, telegram_user_id: int) -> tuple[str, str, list[str]]:
+        """Look up the user's sheet, database id and known activities"""
         sheet_name = self.user_sheet_mapping.get(telegram_user_id)
         if not sheet_name:
             raise ValueError(f"No sheet mapping found for {telegram_user_id=}")
 
-        existing_categories = self.sheets_client.get_activity_columns(sheet_name)
-
         db_user_id = self.db_client.get_user_id_from_telegram(telegram_user_id)
         if db_user_id is None:
             raise ValueError(f"No user found for {telegram_user_id=}")
 
-        existing_categories = self.db_client.get_user_activities(user_id=db_user_id)
-
-        activities = self.activity_parser.parse_message(message, existing_categories)
+        return sheet_name, db_user_id, self.db_client.get_user_activities(user_id=db_user_id)
 
+    def _record_activities(self, sheet_name: str, db_user_id: str, message: str, activities: list[dict]) -> None:
+        """Store parsed activities in the database and write the day totals to the sheet"""
         for activity in activities:
-            self.process_new_entry_sheets(
-                sheet_name=sheet_name,
-                date=activity["date"],
-                activity=activity["activity"],
-                duration=activity["duration"],
-            )
-            self.process_new_entry(
-                db_user_id=db_user_id,
-                activity=activity["activity"],
-                date=activity["date"],
-                duration_minutes=int(round(activity["duration"] * 60)),  # noqa: RUF046
-                raw_input=message,
-            )
-
-    def process_new_entry(
-        self,
-        db_user_id: str,
-        activity: str,
-        date: date,
-        duration_minutes: int,
-        raw_input: str,
-    ) -> None:
-        """Process a new activity entry"""
-        if self.db_client is None:
+            if activity["duration"] < 0:
+                raise ValueError("Duration cannot be negative")
+
+        dates = [activity["date"] for activity in activities]
+        with self._write_lock, self.db_client.transaction() as cursor, self._sheet_batch(sheet_name, dates):
+            entries: list[Entry] = []
+            tracked: dict[tuple[str, date], int] = {}
+            for activity in activities:
+                user_activity_id = self._get_or_create_user_activity_id(db_user_id, activity["activity"], cursor)
+                tracked[activity["activity"], activity["date"]] = user_activity_id
+                entries.append(
+                    {
+                        "user_id": db_user_id,
+                        "user_activity_id": user_activity_id,
+                        "date": activity["date"],
+                        "duration_minutes": int(round(activity["duration"] * 60)),  # noqa: RUF046
+                        "raw_input": message,
+                    }
+                )
+            self.db_client.insert_entries(entries, cursor=cursor)
+
+            # the entries table is the source of truth, so the sheet cell is set to the day's total
+            # rather than read back from the sheet and incremented
+            for (activity_name, activity_date), user_activity_id in tracked.items():
+                if activity_date.year != self.year:
+                    # the sheet only lays out this year's rows, so an entry from another year is kept in the
+                    # database alone rather than failing the rest of the message
+                    logger.warning(
+                        f"Not writing {activity_name} on {activity_date} to {sheet_name}, "
+                        f"which only holds {self.year}; the entry is stored in the database"
+                    )
+                    continue
+                total_minutes = self.db_client.get_activity_minutes_on_date(
+                    db_user_id, user_activity_id, activity_date, cursor=cursor
+                )
+                self.process_new_entry_sheets(
+                    sheet_name=sheet_name,
+                    date=activity_date,
+                    activity=activity_name,
+                    total_hours=round(total_minutes / 60, 2),
+                )
+
+    @contextmanager
+    def _sheet_batch(self, sheet_name: str, dates: list[date]) -> Generator[SheetState, None, None]:
+        """Hold the sheet state for a batch of entries and write every pending cell on exit"""
+        self._sheet_state = self._load_sheet_state(sheet_name, dates)
+        try:
+            yield self._sheet_state
+            self._flush_sheet_state(sheet_name, self._sheet_state)
+        except Exception:
+            # the cached header may now list columns that never reached the sheet
+            self._header_cache.pop(sheet_name, None)
+            self.sheets_client.invalidate_cached_structure()
+            raise
+        finally:
+            self._sheet_state = None
+
+    def _load_sheet_state(self, sheet_name: str, dates: list[date]) -> SheetState:
+        """Resolve the rows for the given dates, reading only what isn't cached yet"""
+        if sheet_name not in self._header_cache:
+            self._header_cache[sheet_name] = self.sheets_client.get_activity_columns(sheet_name)
+
+        # the client indexed column A while initializing the year, so these lookups don't hit the network
+        date_rows = {}
+        for value in dates:
+            row_index = self.sheets_client.get_date_row_index(sheet_name, value) if value.year == self.year else None
+            if row_index is not None:
+                date_rows[format_sheet_date(value)] = row_index
+
+        return SheetState(activities=self._header_cache[sheet_name], date_rows=date_rows)
+
+    def _flush_sheet_state(self, sheet_name: str, state: SheetState) -> None:
+        """Write the header, if it gained columns, and all pending cells in a single request"""
+        if not state.header_changed and not state.pending_cells:
             return
-
-        user_activity_id = self.db_client.get_user_activity_id_from_activity(user_id=db_user_id, activity=activity)
+        self._merge_sheet_header(sheet_name, state)
+        updates = {}
+        if state.header_changed:
+            header_row = ["Date", *state.activities]
+            updates[row_range(1, len(header_row))] = [header_row]
+        updates.update(
+            (f"{column_letter(column_index)}{row_index}", [[value]])
+            for (row_index, column_index), value in sorted(state.pending_cells.items())
+        )
+        if not updates:
+            return
+        self.sheets_client.batch_update(sheet_name, updates)
+        if state.header_changed:
+            self.sheets_client.set_activity_columns(sheet_name, state.activities)
+        state.header_changed = False
+        state.pending_cells.clear()
+
+    def _merge_sheet_header(self, sheet_name: str, state: SheetState) -> None:
+        """Re-read the header before writing, so cells land under their activity and hand-added columns are kept"""
+        # the sheet is shared, so since the header was cached someone may have added, moved or renamed a column;
+        # the cached positions can't be trusted for the write, so each flush reads row 1 first
+        current = self.sheets_client.refresh_activity_columns(sheet_name)
+        merged = SheetState(activities=list(current), date_rows=state.date_rows)
+        for activity in state.activities:
+            if activity not in merged.activity_columns:
+                merged.add_activity(activity)
+
+        # pending cells point at columns of the stale header, so they are moved to the merged one by name
+        state.pending_cells = {
+            (row_index, merged.activity_columns[state.activities[column_index - 1]]): value
+            for (row_index, column_index), value in state.pending_cells.items()
+        }
+        # the state's list is the tracker's cached header, so updating it in place refreshes the cache too
+        state.activities[:] = merged.activities
+        state.activity_columns = merged.activity_columns
+        state.header_changed = merged.header_changed
+
+    def _get_or_create_user_activity_id(
+        self, db_user_id: str, activity: str, cursor: sqlite3.Cursor | psycopg2.extensions.cursor
+    ) -> int:
+        """Look up the user's activity, creating it if this is the first time it is tracked"""
+        user_activity_id = self.db_client.get_user_activity_id_from_activity(
+            user_id=db_user_id, activity=activity, cursor=cursor
+        )
         if user_activity_id is None:
-            user_activity_id = self.db_client.insert_activity(db_user_id, activity)
-        self.db_client.insert_entry(db_user_id, user_activity_id, date, duration_minutes, raw_input)
+            user_activity_id = self.db_client.insert_activity(db_user_id, activity, cursor=cursor)
+        return user_activity_id
+
+    def process_new_entry_sheets(self, sheet_name: str, date: date, activity: str, total_hours: float) -> None:
+        """Record the total hours spent on an activity on a date, with validation"""
+        if self._sheet_state is None:
+            with self._sheet_batch(sheet_name, [date]):
+                self.process_new_entry_sheets(sheet_name, date, activity, total_hours)
+            return
 
-    def process_new_entry_sheets(self, sheet_name: str, date: date, activity: str, duration: float) -> None:
-        """Process a new activity entry with validation"""
-        if duration < 0:
+        if total_hours < 0:
             raise ValueError("Duration cannot be negative")
 
-        logger.info(f"Processing new entry for {sheet_name}: {activity} for {date} - {duration} hours")
+        logger.info(f"Processing new entry for {sheet_name}: {activity} for {date} - {total_hours} hours")
 
-        self.sheets_client.update_activities_header(sheet_name, activity)
-        date_row_index = self.sheets_client.get_date_row_index(sheet_name, date)
+        state = self._sheet_state
+        if activity not in state.activity_columns:
+            logger.info(f"Adding new activity column: {activity}")
+            # state.activities is the cached header list; the sheet's header is rewritten once on flush
+            state.add_activity(activity)
+
+        date_row_index = state.date_rows.get(format_sheet_date(date))
 
         if not date_row_index:
             raise ValueError(f"Could not find row for date: {date}")
 
-        self._update_activity_duration(sheet_name, date_row_index, activity, duration)
-
-    def _update_activity_duration(self, sheet_name: str, row_index: int, activity: str, duration: float) -> None:
-        """Update the duration for a specific activity"""
-        current_values = self.sheets_client.get_row_values(sheet_name=sheet_name, row_index=row_index)
-        activities = self.sheets_client.get_activity_columns(sheet_name=sheet_name)
-        activity_index = activities.index(activity) + 1
-
-        current_values = self._ensure_row_length(current_values, activity_index)
-        current_duration = float(current_values[activity_index] or 0)
-        current_values[activity_index] = current_duration + duration
-
-        self.sheets_client.update_row(sheet_name=sheet_name, row_index=row_index, values=current_values)
+        self._update_activity_duration(state, date_row_index, activity, total_hours)
 
-    @staticmethod
-    def _ensure_row_length(values: list[float], required_length: int) -> list[float]:
-        """Ensure the row has the required length, padding with zeros if needed"""
-        return values + [0] * (required_length + 1 - len(values))
+    def _update_activity_duration(self, state: SheetState, row_index: int, activity: str, total_hours: float) -> None:
+        """Queue the cell write for a specific activity's duration"""
+        state.pending_cells[row_index, state.activity_columns[activity]] = total_hours
@@ -0,0 +1,7 @@
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check an If-None-Match header, which may list several tags or weak ones, against the current ETag"""
+    if not if_none_match:
+        return False
+    # GET comparisons are weak, so W/"x" matches "x"
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
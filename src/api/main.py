@@ -1,5 +1,6 @@
 from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 from src.api.routers import db
@@ -10,7 +11,7 @@ class HealthStatus(BaseModel):
     version: str
 
 
-app = FastAPI(title="Higher Pleasures API")
+app = FastAPI(title="Higher Pleasures API", default_response_class=ORJSONResponse)
 
 
 app.add_middleware(
@@ -1,8 +1,13 @@
+import hashlib
+import threading
+from collections.abc import Callable
 from datetime import date, datetime
 
-from fastapi import APIRouter
-from pydantic import BaseModel
+from cachetools import TTLCache
+from fastapi import APIRouter, Request, Response
+from pydantic import BaseModel, TypeAdapter
 
+from src.api.etag import etag_matches
 from src.db.postgres_client import PostgresClient
 
 
@@ -10,6 +15,14 @@ router = APIRouter(prefix="/db", tags=["database"])
 
 db_client = PostgresClient()
 
+# the endpoints are plain functions because the client is blocking; FastAPI runs them in its
+# threadpool instead of stalling the event loop on each query
+
+# entries only change when the bot records a message, so reads within a short window share one query
+CACHE_TTL_SECONDS = 30
+_responses: TTLCache[str, tuple[str, bytes]] = TTLCache(maxsize=1024, ttl=CACHE_TTL_SECONDS)
+_responses_lock = threading.Lock()
+
 
 class UserBase(BaseModel):
     first_name: str
@@ -24,6 +37,24 @@ class User(UserBase):
     created_at: datetime
 
 
+def _cached_json(request: Request, load_body: Callable[[], bytes]) -> Response:
+    """Serve the path's JSON body from the TTL cache, answering 304 when the client's ETag is current"""
+    key = request.url.path
+    with _responses_lock:
+        cached = _responses.get(key)
+    if cached is None:
+        body = load_body()
+        cached = (f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"', body)
+        with _responses_lock:
+            _responses[key] = cached
+
+    etag, body = cached
+    headers = {"ETag": etag, "Cache-Control": f"max-age={CACHE_TTL_SECONDS}"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 # this corresponds to the actual DB data model
 class Entry(BaseModel):
     user_id: str
@@ -40,19 +71,30 @@ class ActivitySummary(BaseModel):
     data: dict[str, dict[str, int]]
 
 
-@router.get("/entries")
-async def get_entries() -> list[Entry]:
+# the routes return raw responses for the ETag cache, so response_model only documents their shape;
+# the entry arrays are built by Postgres from exactly Entry's fields and served as they come, while
+# the summary is assembled in Python and goes through its model here
+_summary_adapter = TypeAdapter(ActivitySummary)
+
+
+@router.get("/entries", response_model=list[Entry])
+def get_entries(request: Request) -> Response:
     """Return all entries in entries table."""
-    return db_client.get_entries()
+    return _cached_json(request, db_client.get_entries_json)
 
 
-@router.get("/{user_id}/entries")
-async def get_user_entries(user_id: str) -> list[Entry]:
+@router.get("/{user_id}/entries", response_model=list[Entry])
+def get_user_entries(user_id: str, request: Request) -> Response:
     """Return all entries for a specific user."""
-    return db_client.get_user_entries(user_id)
+    return _cached_json(request, lambda: db_client.get_user_entries_json(user_id))
 
 
-@router.get("/{user_id}/entries/activity-summary")
-async def get_user_activity_summary(user_id: str) -> ActivitySummary:
+@router.get("/{user_id}/entries/activity-summary", response_model=ActivitySummary)
+def get_user_activity_summary(user_id: str, request: Request) -> Response:
     """Return summary of user's activity."""
-    return db_client.get_user_activity_summary(user_id)
+    return _cached_json(
+        request,
+        lambda: _summary_adapter.dump_json(
+            _summary_adapter.validate_python(db_client.get_user_activity_summary(user_id))
+        ),
+    )
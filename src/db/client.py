@@ -1,5 +1,7 @@
 import logging
+import queue
 import sqlite3
+import threading
 from collections.abc import Generator
 from contextlib import contextmanager
 from datetime import date
@@ -9,6 +11,40 @@ from typing import TypedDict
 
 logger = logging.getLogger(__name__)
 
+# Applied to every connection; journal_mode=WAL is persisted in the database file itself
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",  # 256MB
+    "PRAGMA cache_size=-65536",  # 64MB
+    "PRAGMA busy_timeout=30000",
+)
+READER_POOL_SIZE = 4
+# stored in PRAGMA user_version once the tables, indexes and date conversion below are in place
+SCHEMA_VERSION = 1
+
+_SQL_INSERT_ACTIVITY = """
+    INSERT INTO activities (user_id, activity)
+    VALUES (?, ?)
+"""
+# the first id wins when an old database still holds duplicates, as in _get_user_activity_ids
+_SQL_SELECT_ACTIVITY_ID = """
+    SELECT user_activity_id FROM activities
+    WHERE user_id = ? AND activity = ?
+    ORDER BY user_activity_id
+    LIMIT 1
+"""
+# entries.date holds date.toordinal(); julianday('0001-01-01') is 1721425.5 and that day's ordinal is 1
+_SQL_CONVERT_TEXT_DATES = """
+    UPDATE entries
+    SET date = CAST(julianday(date) - 1721424.5 AS INTEGER)
+    WHERE typeof(date) = 'text'
+"""
+_SQL_INSERT_ENTRY = """
+    INSERT INTO entries (user_id, user_activity_id, date, duration_minutes, raw_input)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
 
 class Entry(TypedDict):
     user_id: str
@@ -18,30 +54,100 @@ class Entry(TypedDict):
     raw_input: str
 
 
+def _ordinal_to_date(row: dict) -> dict:
+    """Turn the stored ordinal in an entries row back into a date"""
+    row["date"] = date.fromordinal(row["date"])
+    return row
+
+
 class SQLiteClient:
-    def __init__(self, data_dir_path: Path | None = None) -> None:
+    def __init__(self, data_dir_path: Path | None = None, reader_pool_size: int = READER_POOL_SIZE) -> None:
         self.data_dir_path = data_dir_path or Path("/data")
         self.database_dir_path = self.data_dir_path / "db"
         self.database_path = self.database_dir_path / "higher-pleasures.db"
         self._ensure_directory()
+
+        # telegram_id -> user_id and user_id -> {activity: user_activity_id} change rarely,
+        # so they are cached in-process and kept up to date by the insert methods
+        self._telegram_user_ids: dict[int, str] = {}
+        self._activity_ids: dict[str, dict[str, int]] = {}
+
+        # SQLite allows a single writer alongside any number of readers under WAL,
+        # so keep one shared writer connection and a small pool of reader connections
+        self._writer = self._connect()
+        self._writer_lock = threading.Lock()
+        self._enable_wal()
         self._initialize_database()
+        self._readers: queue.Queue[sqlite3.Connection] = queue.Queue(maxsize=reader_pool_size)
+        for _ in range(reader_pool_size):
+            self._readers.put(self._connect(read_only=True))
 
     def _ensure_directory(self) -> None:
         """Ensure all required directories exist"""
         Path.mkdir(self.database_dir_path, exist_ok=True, parents=True)
 
-    @contextmanager
-    def _get_connection(self, *, _autocommit: bool = True) -> Generator[sqlite3.Connection, None, None]:
-        conn = sqlite3.connect(self.database_path)
+    def _connect(self, *, read_only: bool = False) -> sqlite3.Connection:
+        """Open a connection configured with the shared PRAGMAs"""
+        # pooled connections are only ever checked out by one thread at a time;
+        # readers run in autocommit mode since a lone SELECT under WAL needs no transaction
+        conn = sqlite3.connect(self.database_path, check_same_thread=False, isolation_level=None if read_only else "")
         conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        if read_only:
+            conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    @contextmanager
+    def _get_write_conn(self) -> Generator[sqlite3.Connection, None, None]:
+        with self._writer_lock:
+            yield self._writer
+
+    @contextmanager
+    def _get_read_conn(self) -> Generator[sqlite3.Connection, None, None]:
+        conn = self._readers.get()
         try:
             yield conn
         finally:
-            conn.close()
+            self._readers.put(conn)
+
+    @contextmanager
+    def transaction(self) -> Generator[sqlite3.Cursor, None, None]:
+        """Run several writes in one immediate transaction, committing on success and rolling back on error"""
+        with self._get_write_conn() as connection:
+            cursor = connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                yield cursor
+            except Exception:
+                connection.rollback()
+                # write-through cache entries may refer to rows that were just rolled back
+                self._activity_ids.clear()
+                raise
+            connection.commit()
+
+    def close(self) -> None:
+        """Close the writer and every pooled reader connection"""
+        self._writer.close()
+        while not self._readers.empty():
+            self._readers.get_nowait().close()
+
+    def __del__(self) -> None:
+        """Release pooled connections when the client is garbage collected"""
+        if hasattr(self, "_readers"):
+            self.close()
+
+    def _enable_wal(self) -> None:
+        """Switch the database to write-ahead logging so readers don't block the writer"""
+        with self._get_write_conn() as connection:
+            journal_mode = connection.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+            logger.info(f"SQLite journal mode: {journal_mode}")
 
     def _initialize_database(self) -> None:
-        with self._get_connection() as connection:
+        with self._get_write_conn() as connection:
             cursor = connection.cursor()
+            if cursor.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+                return
 
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS users (
@@ -70,15 +176,39 @@ class SQLiteClient:
                 entry_id INTEGER PRIMARY KEY AUTOINCREMENT,
                 user_id TEXT NOT NULL,
                 user_activity_id INTEGER NOT NULL,
-                date DATE NOT NULL,
+                date INTEGER NOT NULL,
                 duration_minutes INTEGER NOT NULL,
                 raw_input TEXT NOT NULL,
                 created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
-                FOREIGN KEY (user_activity_id) REFERENCES activities(activity_id)
+                FOREIGN KEY (user_activity_id) REFERENCES activities(user_activity_id)
             );
             """)
 
+            # databases created before dates were stored as ordinals still hold ISO strings
+            cursor.execute(_SQL_CONVERT_TEXT_DATES)
+            connection.commit()
+
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_telegram ON users(telegram_id);")
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_entries_user_activity_date
+                ON entries(user_id, user_activity_id, date);
+            """)
+            try:
+                cursor.execute("""
+                    CREATE UNIQUE INDEX IF NOT EXISTS idx_activities_user_activity
+                    ON activities(user_id, activity);
+                """)
+                # with duplicate activities the version stays unset, so the unique index is retried next start
+                cursor.execute("ANALYZE")
+                cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            except sqlite3.IntegrityError:
+                logger.warning("Duplicate activities found, creating a non-unique activities(user_id, activity) index")
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_activities_user_activity_nonunique
+                    ON activities(user_id, activity);
+                """)
+
     # ruff: noqa: PLR0913
     def insert_user(
         self,
@@ -89,7 +219,7 @@ class SQLiteClient:
         telegram_id: int,
         email: str | None = None,
     ) -> None:
-        with self._get_connection() as connection:
+        with self._get_write_conn() as connection:
             cursor = connection.cursor()
             cursor.execute(
                 """
@@ -99,56 +229,56 @@ class SQLiteClient:
                 (user_id, first_name, last_name, cell, telegram_id, email),
             )
             connection.commit()
+        self._telegram_user_ids[telegram_id] = user_id
+
+    def _get_user_activity_ids(self, user_id: str, cursor: sqlite3.Cursor | None = None) -> dict[str, int]:
+        """Return the user's activity -> user_activity_id mapping, loading it on first access"""
+        if user_id in self._activity_ids:
+            return self._activity_ids[user_id]
+        if cursor is None:
+            with self._get_read_conn() as connection:
+                return self._get_user_activity_ids(user_id, cursor=connection.cursor())
+
+        cursor.execute(
+            """
+            SELECT activity, user_activity_id
+            FROM activities
+            WHERE user_id = ?
+            ORDER BY user_activity_id
+            """,
+            (user_id,),
+        )
+        activity_ids: dict[str, int] = {}
+        for activity, user_activity_id in cursor.fetchall():
+            activity_ids.setdefault(activity, user_activity_id)
+        self._activity_ids[user_id] = activity_ids
+        return activity_ids
 
     def get_user_activities(self, user_id: str) -> list[str]:
-        with self._get_connection() as connection:
-            cursor = connection.cursor()
-            cursor.execute(
-                """
-                SELECT activity
-                FROM activities
-                WHERE user_id = ?
-                """,
-                (user_id,),
-            )
-            return [row[0] for row in cursor.fetchall()]
+        return list(self._get_user_activity_ids(user_id))
 
-    def get_user_activity_id_from_activity(self, user_id: str, activity: str) -> int:
-        with self._get_connection() as connection:
-            cursor = connection.cursor()
-            cursor.execute(
-                """
-                SELECT user_activity_id
-                FROM activities
-                WHERE user_id = ? AND activity = ?
-                """,
-                (user_id, activity),
-            )
-            result: list[tuple[int]] = cursor.fetchall()
-            return result[0][0]
+    def get_user_activity_id_from_activity(
+        self, user_id: str, activity: str, cursor: sqlite3.Cursor | None = None
+    ) -> int | None:
+        return self._get_user_activity_ids(user_id, cursor=cursor).get(activity)
 
-    def insert_activity(self, user_id: str, activity: str) -> int:
-        with self._get_connection() as connection:
-            cursor = connection.cursor()
-            cursor.execute(
-                """
-                INSERT INTO activities (user_id, activity)
-                VALUES (?, ?)
-                """,
-                (user_id, activity),
-            )
-            row_id = cursor.lastrowid
-            cursor.execute(
-                """
-                SELECT user_activity_id
-                FROM activities
-                WHERE rowid = ?
-                """,
-                (row_id,),
-            )
-            result = cursor.fetchone()
-            connection.commit()
-            return result[0]
+    def insert_activity(self, user_id: str, activity: str, cursor: sqlite3.Cursor | None = None) -> int:
+        if cursor is None:
+            with self.transaction() as transaction_cursor:
+                return self.insert_activity(user_id, activity, cursor=transaction_cursor)
+
+        # a lookup then an insert rather than one upsert: user_activity_id is AUTOINCREMENT, and SQLite advances
+        # its sequence even when ON CONFLICT or INSERT OR IGNORE keeps the existing row. The immediate
+        # transaction holds the write lock, so nothing can add the activity between the two statements
+        row = cursor.execute(_SQL_SELECT_ACTIVITY_ID, (user_id, activity)).fetchone()
+        if row is not None:
+            user_activity_id = row["user_activity_id"]
+        else:
+            # user_activity_id is an INTEGER PRIMARY KEY, so it is the rowid and needs no read back
+            user_activity_id = cursor.execute(_SQL_INSERT_ACTIVITY, (user_id, activity)).lastrowid
+        if user_id in self._activity_ids:
+            self._activity_ids[user_id][activity] = user_activity_id
+        return user_activity_id
 
     def insert_entry(
         self,
@@ -157,20 +287,61 @@ class SQLiteClient:
         date: date,
         duration_minutes: int,
         raw_input: str,
+        cursor: sqlite3.Cursor | None = None,
     ) -> None:
-        with self._get_connection() as connection:
-            cursor = connection.cursor()
-            cursor.execute(
-                """
-                INSERT INTO entries (user_id, user_activity_id, date, duration_minutes, raw_input)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (db_user_id, user_activity_id, date, duration_minutes, raw_input),
-            )
-            connection.commit()
+        if cursor is None:
+            with self.transaction() as transaction_cursor:
+                self.insert_entry(
+                    db_user_id, user_activity_id, date, duration_minutes, raw_input, cursor=transaction_cursor
+                )
+            return
+
+        cursor.execute(_SQL_INSERT_ENTRY, (db_user_id, user_activity_id, date.toordinal(), duration_minutes, raw_input))
+
+    def insert_entries(self, entries: list[Entry], cursor: sqlite3.Cursor | None = None) -> None:
+        """Insert several entries with a single prepared statement"""
+        if cursor is None:
+            with self.transaction() as transaction_cursor:
+                self.insert_entries(entries, cursor=transaction_cursor)
+            return
+
+        cursor.executemany(
+            _SQL_INSERT_ENTRY,
+            [
+                (
+                    entry["user_id"],
+                    entry["user_activity_id"],
+                    entry["date"].toordinal(),
+                    entry["duration_minutes"],
+                    entry["raw_input"],
+                )
+                for entry in entries
+            ],
+        )
+
+    def get_activity_minutes_on_date(
+        self, user_id: str, user_activity_id: int, date: date, cursor: sqlite3.Cursor | None = None
+    ) -> int:
+        """Return the total minutes logged for an activity on a date"""
+        if cursor is None:
+            with self._get_read_conn() as connection:
+                return self.get_activity_minutes_on_date(user_id, user_activity_id, date, cursor=connection.cursor())
+
+        cursor.execute(
+            """
+            SELECT COALESCE(SUM(duration_minutes), 0)
+            FROM entries
+            WHERE user_id = ? AND user_activity_id = ? AND date = ?
+            """,
+            (user_id, user_activity_id, date.toordinal()),
+        )
+        return cursor.fetchone()[0]
 
     def get_user_id_from_telegram(self, telegram_id: int) -> str | None:
-        with self._get_connection() as connection:
+        if telegram_id in self._telegram_user_ids:
+            return self._telegram_user_ids[telegram_id]
+
+        with self._get_read_conn() as connection:
             cursor = connection.cursor()
             cursor.execute(
                 """
@@ -180,15 +351,18 @@ class SQLiteClient:
                 """,
                 (telegram_id,),
             )
-            result = cursor.fetchall()
-            return result[0][0] if result else None
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            self._telegram_user_ids[telegram_id] = row["user_id"]
+            return row["user_id"]
 
     # ruff: noqa: D102
     def is_user_allowed(self, telegram_id: int) -> bool:
         return self.get_user_id_from_telegram(telegram_id) is not None
 
     def get_entries(self) -> list[Entry]:
-        with self._get_connection() as connection:
+        with self._get_read_conn() as connection:
             cursor = connection.cursor()
             cursor.execute(
                 """
@@ -196,16 +370,11 @@ class SQLiteClient:
                 FROM entries
                 """
             )
-            columns = [description[0] for description in cursor.description]
-            rows = cursor.fetchall()
-            entries = []
-            for row in rows:
-                entry = dict(zip(columns, row, strict=False))
-                entries.append(entry)
-            return entries
+            # rows are sqlite3.Row, which dict() converts without pairing names up in Python
+            return [_ordinal_to_date(dict(row)) for row in cursor.fetchall()]
 
     def get_user_entries(self, user_id: str) -> list[Entry]:
-        with self._get_connection() as connection:
+        with self._get_read_conn() as connection:
             cursor = connection.cursor()
             cursor.execute(
                 """
@@ -215,41 +384,39 @@ class SQLiteClient:
                 """,
                 (user_id,),
             )
-            columns = [description[0] for description in cursor.description]
-            rows = cursor.fetchall()
-            entries = []
-            for row in rows:
-                entry = dict(zip(columns, row, strict=False))
-                entries.append(entry)
-            return entries
+            return [_ordinal_to_date(dict(row)) for row in cursor.fetchall()]
 
     ### MIGRATION ZONE ###
     def export_all_users(self) -> list[dict]:
         """Export all users from SQLite database."""
-        with self._get_connection() as connection:
+        with self._get_read_conn() as connection:
             cursor = connection.cursor()
             cursor.execute("SELECT user_id, first_name, last_name, email, cell, telegram_id, created_at FROM users")
-            columns = [description[0] for description in cursor.description]
-            rows = cursor.fetchall()
-            return [dict(zip(columns, row, strict=False)) for row in rows]
+            return [dict(row) for row in cursor.fetchall()]
 
     def export_all_activities(self) -> list[dict]:
         """Export all activities from SQLite database."""
-        with self._get_connection() as connection:
+        with self._get_read_conn() as connection:
             cursor = connection.cursor()
             cursor.execute("SELECT user_activity_id, user_id, activity, created_at FROM activities")
-            columns = [description[0] for description in cursor.description]
-            rows = cursor.fetchall()
-            return [dict(zip(columns, row, strict=False)) for row in rows]
+            return [dict(row) for row in cursor.fetchall()]
+
+    def export_entry_batches(self, batch_size: int) -> Generator[list[dict], None, None]:
+        """Export entries a batch at a time so the whole table is never held in memory"""
+        with self._get_read_conn() as connection:
+            cursor = connection.execute("""
+                SELECT entry_id, user_id, user_activity_id, date, duration_minutes, raw_input, created_at
+                FROM entries
+            """)
+            while batch := cursor.fetchmany(batch_size):
+                yield [_ordinal_to_date(dict(row)) for row in batch]
 
     def export_all_entries(self) -> list[dict]:
         """Export all entries from SQLite database."""
-        with self._get_connection() as connection:
+        with self._get_read_conn() as connection:
             cursor = connection.cursor()
             cursor.execute("""
                 SELECT entry_id, user_id, user_activity_id, date, duration_minutes, raw_input, created_at
                 FROM entries
             """)
-            columns = [description[0] for description in cursor.description]
-            rows = cursor.fetchall()
-            return [dict(zip(columns, row, strict=False)) for row in rows]
+            return [_ordinal_to_date(dict(row)) for row in cursor.fetchall()]
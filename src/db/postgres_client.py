@@ -1,16 +1,71 @@
+import csv
+import io
 import logging
 import os
+import threading
 from collections.abc import Generator
 from contextlib import contextmanager
 from datetime import date
 from typing import Any, TypedDict
 
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
 
 
 logger = logging.getLogger(__name__)
 
+POOL_MIN_CONNECTIONS = 1
+POOL_MAX_CONNECTIONS = 10
+# every table and index _initialize_database creates; when all exist the DDL is skipped
+_SCHEMA_OBJECTS = [
+    "users",
+    "activities",
+    "entries",
+    "idx_users_telegram",
+    "idx_activities_user_activity_unique",
+    "idx_entries_user_activity_date",
+]
+# rows per INSERT statement during imports; larger pages stop paying off around here
+IMPORT_PAGE_SIZE = 1000
+
+# the unique (user_id, activity) index turns a concurrent insert of the same activity into a conflict,
+# which returns no row; without the index (duplicates in an old database) this is a plain insert
+_SQL_INSERT_ACTIVITY = """
+    INSERT INTO activities (user_id, activity)
+    VALUES (%s, %s)
+    ON CONFLICT DO NOTHING
+    RETURNING user_activity_id
+"""
+_SQL_SELECT_ACTIVITY_ID = """
+    SELECT user_activity_id FROM activities
+    WHERE user_id = %s AND activity = %s
+    ORDER BY user_activity_id
+    LIMIT 1
+"""
+_SQL_CREATE_ENTRIES_INDEX = """
+    CREATE INDEX IF NOT EXISTS idx_entries_user_activity_date ON entries(user_id, user_activity_id, date)
+"""
+# the public fields of an entry, matching the API's Entry model; ids and timestamps stay internal
+_SQL_ENTRIES_JSON = """
+    COALESCE(
+        json_agg(
+            json_build_object(
+                'user_id', e.user_id,
+                'user_activity_id', e.user_activity_id,
+                'date', e.date,
+                'duration_minutes', e.duration_minutes,
+                'raw_input', e.raw_input
+            )
+        ),
+        '[]'
+    )::text
+"""
+_SQL_INSERT_ENTRY = """
+    INSERT INTO entries (user_id, user_activity_id, date, duration_minutes, raw_input)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+
 
 class Entry(TypedDict):
     user_id: str
@@ -28,23 +83,58 @@ class ActivitySummary(TypedDict):
 
 
 class PostgresClient:
-    def __init__(self, database_url: str | None = None) -> None:
+    def __init__(self, database_url: str | None = None, max_connections: int = POOL_MAX_CONNECTIONS) -> None:
         self.database_url = database_url or os.environ.get("PROD_POSTGRES_URL") or os.environ.get("DEV_POSTGRES_URL")
         if not self.database_url:
             raise ValueError("POSTGRES_URL must be provided or set as an environment variable")
+        # connections are kept open between calls so each query skips the TCP, TLS and auth handshake;
+        # the pool raises when exhausted, so the semaphore makes callers wait for a free connection instead
+        self._pool = ThreadedConnectionPool(POOL_MIN_CONNECTIONS, max_connections, dsn=self.database_url)
+        self._pool_slots = threading.BoundedSemaphore(max_connections)
+        # telegram_id -> user_id and user_id -> {activity: user_activity_id} change rarely,
+        # so they are cached in-process and kept up to date by the insert methods
+        self._telegram_user_ids: dict[int, str] = {}
+        self._activity_ids: dict[str, dict[str, int]] = {}
         self._initialize_database()
 
     @contextmanager
     def _get_connection(self) -> Generator[psycopg2.extensions.connection, None, None]:
-        try:
-            conn = psycopg2.connect(self.database_url)
-            yield conn
-        finally:
-            conn.close()
+        with self._pool_slots:
+            connection = self._pool.getconn()
+            try:
+                yield connection
+            finally:
+                # the pool rolls back a transaction left open; a connection the server dropped is discarded
+                self._pool.putconn(connection, close=bool(connection.closed))
+
+    def close(self) -> None:
+        """Close every pooled connection"""
+        self._pool.closeall()
+
+    @contextmanager
+    def transaction(self) -> Generator[psycopg2.extensions.cursor, None, None]:
+        """Run several writes in one transaction, committing on success and rolling back on error"""
+        with self._get_connection() as connection, connection.cursor() as cursor:
+            try:
+                yield cursor
+            except Exception:
+                connection.rollback()
+                # write-through cache entries may refer to rows that were just rolled back
+                self._activity_ids.clear()
+                raise
+            connection.commit()
 
     def _initialize_database(self) -> None:
         with self._get_connection() as connection:
             with connection.cursor() as cursor:
+                # one round-trip to check for the schema instead of the DDL below on every start
+                cursor.execute(
+                    "SELECT bool_and(to_regclass(name) IS NOT NULL) FROM unnest(%s::text[]) AS name",
+                    (_SCHEMA_OBJECTS,),
+                )
+                if cursor.fetchone()[0]:
+                    return
+
                 cursor.execute("""
                     CREATE TABLE IF NOT EXISTS users (
                     user_id TEXT PRIMARY KEY,
@@ -81,8 +171,32 @@ class PostgresClient:
                 );
                 """)
 
+                # the bot looks users up by telegram id, activities by name, and sums a day's entries
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_telegram ON users(telegram_id)")
+                self._create_activities_index(cursor)
+                cursor.execute(_SQL_CREATE_ENTRIES_INDEX)
+                cursor.execute("ANALYZE users, activities, entries")
+
             connection.commit()
 
+    @staticmethod
+    def _create_activities_index(cursor: psycopg2.extensions.cursor) -> None:
+        """Index activities by user and name, uniquely unless the table already holds duplicates"""
+        cursor.execute("SAVEPOINT activities_index")
+        try:
+            cursor.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_activities_user_activity_unique ON activities(user_id, activity)"
+            )
+        except psycopg2.errors.UniqueViolation:
+            # the unique index is missing from _SCHEMA_OBJECTS then, so it is retried on the next start
+            cursor.execute("ROLLBACK TO SAVEPOINT activities_index")
+            logger.warning("Duplicate activities found, creating a non-unique activities(user_id, activity) index")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_activities_user_activity ON activities(user_id, activity)")
+        else:
+            # the non-unique index of older databases is redundant next to the unique one
+            cursor.execute("DROP INDEX IF EXISTS idx_activities_user_activity")
+        cursor.execute("RELEASE SAVEPOINT activities_index")
+
     # ruff: noqa: PLR0913
     def insert_user(
         self,
@@ -101,46 +215,55 @@ class PostgresClient:
                 """,
                 (user_id, first_name, last_name, cell, telegram_id, email),
             )
-        connection.commit()
+            connection.commit()
+        self._telegram_user_ids[telegram_id] = user_id
 
-    def get_user_activities(self, user_id: str) -> list[str]:
-        with self._get_connection() as connection, connection.cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT activity
-                FROM activities
-                WHERE user_id = %s
-                """,
-                (user_id,),
-            )
-            return [row[0] for row in cursor.fetchall()]
+    def _get_user_activity_ids(self, user_id: str, cursor: psycopg2.extensions.cursor | None = None) -> dict[str, int]:
+        """Return the user's activity -> user_activity_id mapping, loading it on first access"""
+        if user_id in self._activity_ids:
+            return self._activity_ids[user_id]
+        if cursor is None:
+            with self._get_connection() as connection, connection.cursor() as new_cursor:
+                return self._get_user_activity_ids(user_id, cursor=new_cursor)
 
-    def get_user_activity_id_from_activity(self, user_id: str, activity: str) -> int:
-        with self._get_connection() as connection, connection.cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT user_activity_id
-                FROM activities
-                WHERE user_id = %s AND activity = %s
-                """,
-                (user_id, activity),
-            )
-            result = cursor.fetchone()
-            return result[0]
+        cursor.execute(
+            """
+            SELECT activity, user_activity_id
+            FROM activities
+            WHERE user_id = %s
+            ORDER BY user_activity_id
+            """,
+            (user_id,),
+        )
+        activity_ids: dict[str, int] = {}
+        for activity, user_activity_id in cursor.fetchall():
+            activity_ids.setdefault(activity, user_activity_id)
+        self._activity_ids[user_id] = activity_ids
+        return activity_ids
 
-    def insert_activity(self, user_id: str, activity: str) -> int:
-        with self._get_connection() as connection, connection.cursor() as cursor:
-            cursor.execute(
-                """
-                INSERT INTO activities (user_id, activity)
-                VALUES (%s, %s)
-                RETURNING user_activity_id
-                """,
-                (user_id, activity),
-            )
-            activity_id = cursor.fetchone()[0]
-            connection.commit()
-            return activity_id
+    def get_user_activities(self, user_id: str) -> list[str]:
+        return list(self._get_user_activity_ids(user_id))
+
+    def get_user_activity_id_from_activity(
+        self, user_id: str, activity: str, cursor: psycopg2.extensions.cursor | None = None
+    ) -> int | None:
+        return self._get_user_activity_ids(user_id, cursor=cursor).get(activity)
+
+    def insert_activity(self, user_id: str, activity: str, cursor: psycopg2.extensions.cursor | None = None) -> int:
+        if cursor is None:
+            with self.transaction() as transaction_cursor:
+                return self.insert_activity(user_id, activity, cursor=transaction_cursor)
+
+        cursor.execute(_SQL_INSERT_ACTIVITY, (user_id, activity))
+        row = cursor.fetchone()
+        if row is None:
+            # another connection inserted the activity since the caller checked the cache
+            cursor.execute(_SQL_SELECT_ACTIVITY_ID, (user_id, activity))
+            row = cursor.fetchone()
+        user_activity_id = row[0]
+        if user_id in self._activity_ids:
+            self._activity_ids[user_id][activity] = user_activity_id
+        return user_activity_id
 
     def insert_entry(
         self,
@@ -149,18 +272,61 @@ class PostgresClient:
         date: date,
         duration_minutes: int,
         raw_input: str,
+        cursor: psycopg2.extensions.cursor | None = None,
     ) -> None:
-        with self._get_connection() as connection, connection.cursor() as cursor:
-            cursor.execute(
-                """
-                INSERT INTO entries (user_id, user_activity_id, date, duration_minutes, raw_input)
-                VALUES (%s, %s, %s, %s, %s)
-                """,
-                (db_user_id, user_activity_id, date, duration_minutes, raw_input),
-            )
-            connection.commit()
+        if cursor is None:
+            with self.transaction() as transaction_cursor:
+                self.insert_entry(
+                    db_user_id, user_activity_id, date, duration_minutes, raw_input, cursor=transaction_cursor
+                )
+            return
+
+        cursor.execute(_SQL_INSERT_ENTRY, (db_user_id, user_activity_id, date, duration_minutes, raw_input))
+
+    def insert_entries(self, entries: list[Entry], cursor: psycopg2.extensions.cursor | None = None) -> None:
+        """Insert several entries in a single multi-row statement"""
+        if cursor is None:
+            with self.transaction() as transaction_cursor:
+                self.insert_entries(entries, cursor=transaction_cursor)
+            return
+
+        execute_values(
+            cursor,
+            "INSERT INTO entries (user_id, user_activity_id, date, duration_minutes, raw_input) VALUES %s",
+            [
+                (
+                    entry["user_id"],
+                    entry["user_activity_id"],
+                    entry["date"],
+                    entry["duration_minutes"],
+                    entry["raw_input"],
+                )
+                for entry in entries
+            ],
+        )
+
+    def get_activity_minutes_on_date(
+        self, user_id: str, user_activity_id: int, date: date, cursor: psycopg2.extensions.cursor | None = None
+    ) -> int:
+        """Return the total minutes logged for an activity on a date"""
+        if cursor is None:
+            with self._get_connection() as connection, connection.cursor() as new_cursor:
+                return self.get_activity_minutes_on_date(user_id, user_activity_id, date, cursor=new_cursor)
+
+        cursor.execute(
+            """
+            SELECT COALESCE(SUM(duration_minutes), 0)
+            FROM entries
+            WHERE user_id = %s AND user_activity_id = %s AND date = %s
+            """,
+            (user_id, user_activity_id, date),
+        )
+        return cursor.fetchone()[0]
+
+    def get_user_id_from_telegram(self, telegram_id: int) -> str | None:
+        if telegram_id in self._telegram_user_ids:
+            return self._telegram_user_ids[telegram_id]
 
-    def get_user_id_from_telegram(self, telegram_id: int) -> str:
         with self._get_connection() as connection, connection.cursor() as cursor:
             cursor.execute(
                 """
@@ -171,35 +337,27 @@ class PostgresClient:
                 (telegram_id,),
             )
             result = cursor.fetchone()
-            return result[0] if result else None
+            if not result:
+                return None
+            self._telegram_user_ids[telegram_id] = result[0]
+            return result[0]
 
     # ruff: noqa: D102
     def is_user_allowed(self, telegram_id: int) -> bool:
         return self.get_user_id_from_telegram(telegram_id) is not None
 
-    def get_entries(self) -> list[Entry]:
-        with self._get_connection() as connection, connection.cursor(cursor_factory=RealDictCursor) as cursor:
-            cursor.execute(
-                """
-                SELECT *
-                FROM entries
-                """
-            )
-            entries = cursor.fetchall()
-            return [dict(entry) for entry in entries]
+    def get_entries_json(self) -> bytes:
+        """Return every entry as a JSON array built by the server, skipping per-row conversion in Python"""
+        with self._get_connection() as connection, connection.cursor() as cursor:
+            # cast to text so psycopg2 hands the JSON over as-is instead of parsing it; the router serves these bytes
+            cursor.execute(f"SELECT {_SQL_ENTRIES_JSON} FROM entries e")
+            return cursor.fetchone()[0].encode()
 
-    def get_user_entries(self, user_id: str) -> list[Entry]:
-        with self._get_connection() as connection, connection.cursor(cursor_factory=RealDictCursor) as cursor:
-            cursor.execute(
-                """
-                SELECT *
-                FROM entries
-                WHERE user_id = %s
-                """,
-                (user_id,),
-            )
-            entries = cursor.fetchall()
-            return [dict(entry) for entry in entries]
+    def get_user_entries_json(self, user_id: str) -> bytes:
+        """Return a user's entries as a JSON array built by the server"""
+        with self._get_connection() as connection, connection.cursor() as cursor:
+            cursor.execute(f"SELECT {_SQL_ENTRIES_JSON} FROM entries e WHERE e.user_id = %s", (user_id,))
+            return cursor.fetchone()[0].encode()
 
     def get_user_activity_summary(self, user_id: str) -> ActivitySummary:
         """
@@ -288,100 +446,177 @@ class PostgresClient:
             return {"full_name": full_name, "activities": activities, "dates": dates, "data": data}
 
     ### MIGRATION ZONE ###
+    @contextmanager
+    def _import_transaction(self) -> Generator[psycopg2.extensions.cursor, None, None]:
+        """Open a transaction for a bulk import, which can be re-run if a crash loses its commit"""
+        with self.transaction() as cursor:
+            cursor.execute("SET LOCAL synchronous_commit = off")
+            yield cursor
+
+    @staticmethod
+    def _import_rows(cursor: psycopg2.extensions.cursor, query: str, rows: list[tuple]) -> None:
+        """Insert rows a page at a time, skipping any page that fails rather than aborting the whole import"""
+        for start in range(0, len(rows), IMPORT_PAGE_SIZE):
+            page = rows[start : start + IMPORT_PAGE_SIZE]
+            cursor.execute("SAVEPOINT import_page")
+            try:
+                execute_values(cursor, query, page, page_size=IMPORT_PAGE_SIZE)
+            except psycopg2.Error:
+                logger.exception(f"Error importing rows {start} to {start + len(page) - 1}, skipping them")
+                cursor.execute("ROLLBACK TO SAVEPOINT import_page")
+            cursor.execute("RELEASE SAVEPOINT import_page")
+
     def import_users(self, users: list[dict]) -> None:
         """Import users into PostgreSQL database."""
-        with self._get_connection() as connection:
-            with connection.cursor() as cursor:
-                for user in users:
-                    try:
-                        cursor.execute(
-                            """
-                            INSERT INTO users (user_id, first_name, last_name, email, cell, telegram_id, created_at)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s)
-                            """,
-                            (
-                                user["user_id"],
-                                user["first_name"],
-                                user["last_name"],
-                                user["email"],
-                                user["cell"],
-                                user["telegram_id"],
-                                user["created_at"],
-                            ),
-                        )
-                    except Exception:
-                        logger.exception(f"Error importing user {user['user_id']}")
-            connection.commit()
+        with self._import_transaction() as cursor:
+            self._import_rows(
+                cursor,
+                """
+                INSERT INTO users (user_id, first_name, last_name, email, cell, telegram_id, created_at)
+                VALUES %s
+                ON CONFLICT (user_id) DO NOTHING
+                """,
+                [
+                    (
+                        user["user_id"],
+                        user["first_name"],
+                        user["last_name"],
+                        user["email"],
+                        user["cell"],
+                        user["telegram_id"],
+                        user["created_at"],
+                    )
+                    for user in users
+                ],
+            )
 
     def import_activities(self, activities: list[dict]) -> None:
         """Import activities into PostgreSQL database."""
-        with self._get_connection() as connection:
-            with connection.cursor() as cursor:
-                for activity in activities:
-                    try:
-                        cursor.execute(
-                            """
-                            INSERT INTO activities (user_activity_id, user_id, activity, created_at)
-                            VALUES (%s, %s, %s, %s)
-                            """,
-                            (
-                                activity["user_activity_id"],
-                                activity["user_id"],
-                                activity["activity"],
-                                activity["created_at"],
-                            ),
-                        )
-                    except Exception:
-                        logger.exception(f"Error importing activity {activity['user_activity_id']}")
-            connection.commit()
+        with self._import_transaction() as cursor:
+            # a page holding a duplicate activity from an old database would be skipped under the unique
+            # index, so the index is rebuilt after the import, falling back to a non-unique one
+            cursor.execute("DROP INDEX IF EXISTS idx_activities_user_activity_unique")
+            self._import_rows(
+                cursor,
+                """
+                INSERT INTO activities (user_activity_id, user_id, activity, created_at)
+                VALUES %s
+                ON CONFLICT (user_activity_id) DO NOTHING
+                """,
+                [
+                    (
+                        activity["user_activity_id"],
+                        activity["user_id"],
+                        activity["activity"],
+                        activity["created_at"],
+                    )
+                    for activity in activities
+                ],
+            )
+            self._create_activities_index(cursor)
 
     def import_entries(self, entries: list[dict]) -> None:
         """Import entries into PostgreSQL database."""
-        with self._get_connection() as connection:
-            with connection.cursor() as cursor:
-                for entry in entries:
-                    try:
-                        cursor.execute(
-                            """
-                            INSERT INTO
-                                entries (entry_id, user_id, user_activity_id, date, duration_minutes, raw_input, created_at)
-                            VALUES
-                                (%s, %s, %s, %s, %s, %s, %s)
-                            """,
-                            (
-                                entry["entry_id"],
-                                entry["user_id"],
-                                entry["user_activity_id"],
-                                entry["date"],
-                                entry["duration_minutes"],
-                                entry["raw_input"],
-                                entry["created_at"],
-                            ),
-                        )
-                    except Exception:
-                        logger.exception(f"Error importing entry {entry['entry_id']}")
-            connection.commit()
+        rows = [
+            (
+                entry["entry_id"],
+                entry["user_id"],
+                entry["user_activity_id"],
+                entry["date"],
+                entry["duration_minutes"],
+                entry["raw_input"],
+                entry["created_at"],
+            )
+            for entry in entries
+        ]
+        with self._import_transaction() as cursor:
+            if len(rows) >= IMPORT_PAGE_SIZE and self._copy_entries(cursor, rows):
+                return
+            self._import_rows(
+                cursor,
+                """
+                INSERT INTO
+                    entries (entry_id, user_id, user_activity_id, date, duration_minutes, raw_input, created_at)
+                VALUES %s
+                ON CONFLICT (entry_id) DO NOTHING
+                """,
+                rows,
+            )
+
+    @staticmethod
+    def _copy_entries(cursor: psycopg2.extensions.cursor, rows: list[tuple]) -> bool:
+        """
+        Stream entries in with COPY, which skips per-row parsing, returning False if they must be inserted instead.
+
+        COPY can't skip conflicting rows, so it fills a temporary table that is merged into entries.
+        """
+        buffer = io.StringIO()
+        # quoting every non-numeric field keeps an empty raw_input from being read back as NULL
+        csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC).writerows(rows)
+        buffer.seek(0)
+
+        cursor.execute("SAVEPOINT copy_entries")
+        try:
+            cursor.execute("CREATE TEMPORARY TABLE entries_import (LIKE entries) ON COMMIT DROP")
+            cursor.copy_expert(
+                """
+                COPY entries_import (entry_id, user_id, user_activity_id, date, duration_minutes, raw_input, created_at)
+                FROM STDIN WITH (FORMAT csv)
+                """,
+                buffer,
+            )
+            cursor.execute(
+                """
+                INSERT INTO
+                    entries (entry_id, user_id, user_activity_id, date, duration_minutes, raw_input, created_at)
+                SELECT entry_id, user_id, user_activity_id, date, duration_minutes, raw_input, created_at
+                FROM entries_import
+                ON CONFLICT (entry_id) DO NOTHING
+                """
+            )
+        except psycopg2.Error:
+            logger.warning("COPY of entries failed, falling back to paged inserts", exc_info=True)
+            cursor.execute("ROLLBACK TO SAVEPOINT copy_entries")
+            cursor.execute("RELEASE SAVEPOINT copy_entries")
+            return False
+        cursor.execute("RELEASE SAVEPOINT copy_entries")
+        return True
+
+    def drop_entry_indexes(self) -> None:
+        """Drop the entries lookup index so a bulk import doesn't maintain it row by row"""
+        with self.transaction() as cursor:
+            cursor.execute("DROP INDEX IF EXISTS idx_entries_user_activity_date")
+
+    def create_entry_indexes(self) -> None:
+        """Rebuild the entries lookup index in one pass after a bulk import"""
+        with self.transaction() as cursor:
+            cursor.execute("SET LOCAL maintenance_work_mem = '256MB'")
+            cursor.execute(_SQL_CREATE_ENTRIES_INDEX)
+            cursor.execute("ANALYZE entries")
 
     def disable_autoincrement_constraints(self) -> None:
         """Temporarily disable sequence constraints to allow importing IDs directly."""
-        with self._get_connection() as connection:
-            with connection.cursor() as cursor:
-                cursor.execute("ALTER SEQUENCE activities_user_activity_id_seq RESTART WITH 1000")
-                cursor.execute("ALTER SEQUENCE entries_entry_id_seq RESTART WITH 1000")
-            connection.commit()
+        with self.transaction() as cursor:
+            # setval doesn't take the exclusive lock ALTER SEQUENCE does, and both move in one statement
+            cursor.execute(
+                """
+                SELECT
+                    setval('activities_user_activity_id_seq', 1000, false),
+                    setval('entries_entry_id_seq', 1000, false)
+                """
+            )
 
     def reset_sequences(self) -> None:
         """Reset sequences after import to continue from the highest imported ID."""
-        with self._get_connection() as connection:
-            with connection.cursor() as cursor:
-                # Find max IDs
-                cursor.execute("SELECT MAX(user_activity_id) FROM activities")
-                max_activity_id = cursor.fetchone()[0] or 0
-
-                cursor.execute("SELECT MAX(entry_id) FROM entries")
-                max_entry_id = cursor.fetchone()[0] or 0
-
-                # Reset sequences
-                cursor.execute(f"ALTER SEQUENCE activities_user_activity_id_seq RESTART WITH {max_activity_id + 1}")
-                cursor.execute(f"ALTER SEQUENCE entries_entry_id_seq RESTART WITH {max_entry_id + 1}")
-            connection.commit()
+        with self.transaction() as cursor:
+            cursor.execute(
+                """
+                SELECT
+                    setval(
+                        'activities_user_activity_id_seq',
+                        COALESCE((SELECT MAX(user_activity_id) FROM activities), 0) + 1,
+                        false
+                    ),
+                    setval('entries_entry_id_seq', COALESCE((SELECT MAX(entry_id) FROM entries), 0) + 1, false)
+                """
+            )
@@ -1,6 +1,8 @@
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
 from pathlib import Path
 
 
@@ -13,6 +15,9 @@ def setup_logging(app_name: str = "activity-bot") -> None:
 
     """
     log_dir = Path(os.getenv("LOG_DIR", "/data/logs"))
+    # large files rotate rarely, and each rotation renames every backup
+    max_bytes = int(os.getenv("LOG_MAX_BYTES", str(64 * 1024 * 1024)))
+    backup_count = int(os.getenv("LOG_BACKUPS", "3"))
     Path.mkdir(log_dir, parents=True, exist_ok=True)
 
     # Configure root logger
@@ -24,27 +29,44 @@ def setup_logging(app_name: str = "activity-bot") -> None:
     console_handler.setLevel(logging.INFO)
     console_formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
     console_handler.setFormatter(console_formatter)
-    root_logger.addHandler(console_handler)
 
     # File handler with rotation
     file_handler = logging.handlers.RotatingFileHandler(
         filename=log_dir / f"{app_name}.log",
-        maxBytes=10_000_000,  # 10MB
-        backupCount=5,
+        maxBytes=max_bytes,
+        backupCount=backup_count,
         encoding="utf-8",
+        delay=True,
     )
     file_handler.setLevel(logging.INFO)
     file_formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
     file_handler.setFormatter(file_formatter)
-    root_logger.addHandler(file_handler)
+    # INFO lines reach the file in bulk writes; an ERROR, a full buffer or shutdown flushes them
+    buffered_file_handler = logging.handlers.MemoryHandler(
+        capacity=512, flushLevel=logging.ERROR, target=file_handler, flushOnClose=True
+    )
+    buffered_file_handler.setLevel(logging.INFO)
 
     # Add error file handler for ERROR and above
     error_handler = logging.handlers.RotatingFileHandler(
         filename=log_dir / f"{app_name}-error.log",
-        maxBytes=10_000_000,  # 10MB
-        backupCount=5,
+        maxBytes=max_bytes,
+        backupCount=backup_count,
         encoding="utf-8",
+        delay=True,
     )
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(file_formatter)
-    root_logger.addHandler(error_handler)
+
+    # callers only enqueue records; a background thread does the writes and rotation, so a slow
+    # disk doesn't stall the bot's handlers
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(
+        log_queue, console_handler, buffered_file_handler, error_handler, respect_handler_level=True
+    )
+    listener.start()
+    # stopping drains the queue and flushing empties the buffer, so records logged just before exit
+    # still reach the files; atexit runs these in reverse, stopping the listener first
+    atexit.register(buffered_file_handler.flush)
+    atexit.register(listener.stop)
@@ -1,15 +1,17 @@
 import logging
 import os
-from typing import TypedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING, TypedDict
 
 from dotenv import load_dotenv
 
-from src.activities.parser import OpenAIActivityParser
-from src.activities.tracker import ActivityTracker
-from src.db.postgres_client import PostgresClient
 from src.logging_config.logging_config import setup_logging
-from src.messaging.telegram_handler import TelegramHandler
-from src.sheets.client import GoogleSheetsClient
+
+
+if TYPE_CHECKING:
+    from src.db.client import SQLiteClient
+    from src.db.postgres_client import PostgresClient
+    from src.messaging.telegram_handler import TelegramHandler
 
 
 class AppConfig(TypedDict):
@@ -26,20 +28,30 @@ class AppConfig(TypedDict):
     POSTGRES_URL: str
 
 
+# each setting and the environment variables that can supply it, in order of preference
+CONFIG_SOURCES: dict[str, tuple[str, ...]] = {
+    "SPREADSHEET_ID": ("SPREADSHEET_ID",),
+    "FRIEND_SHEET_NAME": ("FRIEND_SHEET_NAME",),
+    "MY_SHEET_NAME": ("MY_SHEET_NAME",),
+    "FRIEND_TELEGRAM_ID": ("FRIEND_TELEGRAM_ID",),
+    "MY_TELEGRAM_ID": ("MY_TELEGRAM_ID",),
+    "OPENAI_API_KEY": ("OPENAI_API_KEY",),
+    "TELEGRAM_BOT_API_KEY": ("TELEGRAM_TEST_BOT_API_KEY", "TELEGRAM_BOT_API_KEY"),
+    "GOOGLE_CREDENTIALS": ("GOOGLE_CREDENTIALS",),
+    "POSTGRES_URL": ("PROD_POSTGRES_URL", "DEV_POSTGRES_URL"),
+}
+
+
+# the .env file and environment are read once per process and later callers share the result;
+# tests or reloads that change the environment call load_config.cache_clear() first
+@lru_cache(maxsize=1)
 def load_config() -> AppConfig:
     """Load configuration from environment variables"""
     load_dotenv()
 
+    env = dict(os.environ)
     required_vars = {
-        "SPREADSHEET_ID": os.getenv("SPREADSHEET_ID"),
-        "FRIEND_SHEET_NAME": os.getenv("FRIEND_SHEET_NAME"),
-        "MY_SHEET_NAME": os.getenv("MY_SHEET_NAME"),
-        "FRIEND_TELEGRAM_ID": os.getenv("FRIEND_TELEGRAM_ID"),
-        "MY_TELEGRAM_ID": os.getenv("MY_TELEGRAM_ID"),
-        "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY"),
-        "TELEGRAM_BOT_API_KEY": os.getenv("TELEGRAM_TEST_BOT_API_KEY") or os.getenv("TELEGRAM_BOT_API_KEY"),
-        "GOOGLE_CREDENTIALS": os.getenv("GOOGLE_CREDENTIALS"),
-        "POSTGRES_URL": os.getenv("PROD_POSTGRES_URL") or os.getenv("DEV_POSTGRES_URL"),
+        key: next((env[name] for name in names if env.get(name)), None) for key, names in CONFIG_SOURCES.items()
     }
 
     missing = [k for k, v in required_vars.items() if not v]
@@ -51,13 +63,16 @@ def load_config() -> AppConfig:
     return required_vars
 
 
-# ruff: noqa: D103
-def main() -> None:
-    setup_logging()
-    logger = logging.getLogger(__name__)
-    logger.info("Starting Higher Pleasures Bot")
+def build_app(config: AppConfig, db_client: "SQLiteClient | PostgresClient") -> "TelegramHandler":
+    """Wire the sheets, parser and tracker to a database client, returning the bot ready to poll"""
+    # the SDK-backed modules pull in openai, googleapiclient and telegram, so they are
+    # only imported once the configuration is known to be complete
+    from src.activities.parser import OpenAIActivityParser
+    from src.activities.tracker import ActivityTracker
+    from src.messaging.telegram_handler import TelegramHandler
+    from src.sheets.cache_store import CacheStore
+    from src.sheets.client import GoogleSheetsClient
 
-    config = load_config()
     user_sheet_mapping = {
         int(config["FRIEND_TELEGRAM_ID"]): config["FRIEND_SHEET_NAME"],
         int(config["MY_TELEGRAM_ID"]): config["MY_SHEET_NAME"],
@@ -66,10 +81,9 @@ def main() -> None:
     # Initialize components
     sheets_client = GoogleSheetsClient(
         spreadsheet_id=config["SPREADSHEET_ID"],
+        cache_store=CacheStore(spreadsheet_id=config["SPREADSHEET_ID"]),
     )
 
-    db_client = PostgresClient()
-
     activity_parser = OpenAIActivityParser(api_key=config["OPENAI_API_KEY"], confidence_threshold=0.7)
 
     tracker = ActivityTracker(
@@ -79,12 +93,26 @@ def main() -> None:
         db_client=db_client,
     )
 
-    telegram_handler = TelegramHandler(
+    return TelegramHandler(
         token=config["TELEGRAM_BOT_API_KEY"],
         activity_tracker=tracker,
         db_client=db_client,
     )
 
+
+# ruff: noqa: D103
+def main() -> None:
+    setup_logging()
+    logger = logging.getLogger(__name__)
+    logger.info("Starting Higher Pleasures Bot")
+
+    config = load_config()
+
+    # psycopg2 is likewise only imported once the configuration is complete
+    from src.db.postgres_client import PostgresClient
+
+    telegram_handler = build_app(config, PostgresClient())
+
     logger.info("🤖 Starting Telegram bot...")
     telegram_handler.start_polling()
 
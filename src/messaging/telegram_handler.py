@@ -37,10 +37,14 @@ class TelegramHandler:
         """
         self.token = token
         self.activity_tracker = activity_tracker
-        self.application = Application.builder().token(token).build()
+        self.application = Application.builder().token(token).post_init(self._warm_up).build()
         self.db_client = db_client
         self.onboarder = TelegramOnboarder(db_client)
 
+    async def _warm_up(self, _application: Application) -> None:
+        """Connect to OpenAI on the bot's event loop so the first message skips the handshake"""
+        await self.activity_tracker.activity_parser.warm_up_async()
+
     async def start(self, update: Update, _context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle the /start command"""
         if not self._is_user_allowed(update):
@@ -112,7 +116,7 @@ class TelegramHandler:
             return
 
         try:
-            self.activity_tracker.track_activity(telegram_user_id=user_id, message=message_text)
+            await self.activity_tracker.track_activity_async(telegram_user_id=user_id, message=message_text)
             await update.message.reply_text("✅ Activity tracked!")
 
         except Exception:
@@ -137,6 +141,8 @@ class TelegramHandler:
             MessageHandler(
                 (filters.TEXT & ~filters.COMMAND & (filters.ChatType.GROUPS | filters.ChatType.PRIVATE)),
                 self.track_activity,
+                # activity messages don't block other updates while tracking; the tracker serializes its writes
+                block=False,
             )
         )
 
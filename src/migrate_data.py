@@ -1,7 +1,7 @@
 import logging
 
 from src.db.client import SQLiteClient
-from src.db.postgres_client import PostgresClient
+from src.db.postgres_client import IMPORT_PAGE_SIZE, PostgresClient
 
 
 logging.basicConfig(
@@ -11,7 +11,7 @@ logging.basicConfig(
 logger = logging.getLogger("db_migration")
 
 
-def migrate_sqlite_to_postgres(batch_size: int = 100) -> None:
+def migrate_sqlite_to_postgres(batch_size: int = IMPORT_PAGE_SIZE) -> None:
     """
     Migrate data from SQLite to PostgreSQL.
 
@@ -43,18 +43,19 @@ def migrate_sqlite_to_postgres(batch_size: int = 100) -> None:
         logger.info(f"Found {len(activities)} activities to migrate")
         postgres_client.import_activities(activities)
 
-        # Migrate entries (potentially larger, so use batching)
+        # Migrate entries (potentially larger, so stream them in batches), building the lookup index
+        # once at the end rather than row by row
         logger.info("Migrating entries")
-        entries = sqlite_client.export_all_entries()
-        logger.info(f"Found {len(entries)} entries to migrate")
-
-        # Process entries in batches
-        for i in range(0, len(entries), batch_size):
-            batch = entries[i : i + batch_size]
-            logger.info(
-                f"Migrating entries batch {i // batch_size + 1}/{(len(entries) + batch_size - 1) // batch_size}"
-            )
-            postgres_client.import_entries(batch)
+        postgres_client.drop_entry_indexes()
+        try:
+            migrated = 0
+            for batch in sqlite_client.export_entry_batches(batch_size):
+                postgres_client.import_entries(batch)
+                migrated += len(batch)
+                logger.info(f"Migrated {migrated} entries")
+        finally:
+            logger.info("Rebuilding entries index")
+            postgres_client.create_entry_indexes()
 
         # Reset sequences to continue from highest imported IDs
         logger.info("Resetting PostgreSQL sequences")
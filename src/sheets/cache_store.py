@@ -0,0 +1,51 @@
+import json
+import logging
+import time
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "higher_pleasures"
+MAX_AGE_SECONDS = 24 * 60 * 60
+
+
+class CacheStore:
+    """Persists each sheet's header and column A index so a restart can skip re-reading them"""
+
+    def __init__(
+        self, spreadsheet_id: str, cache_dir: Path | None = None, max_age_seconds: int = MAX_AGE_SECONDS
+    ) -> None:
+        self.spreadsheet_id = spreadsheet_id
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_age_seconds = max_age_seconds
+
+    def _path(self, year: int) -> Path:
+        return self.cache_dir / f"state-{year}.json"
+
+    def load(self, year: int) -> dict[str, dict] | None:
+        """Return the saved per-sheet state for the year, or None if it is missing, stale or for another spreadsheet"""
+        path = self._path(year)
+        try:
+            if time.time() - path.stat().st_mtime > self.max_age_seconds:
+                return None
+            state = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        if state.get("spreadsheet_id") != self.spreadsheet_id:
+            return None
+        return state.get("sheets")
+
+    def save(self, year: int, sheets: dict[str, dict]) -> None:
+        """Save the per-sheet state for the year, logging rather than failing if the file can't be written"""
+        path = self._path(year)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps({"spreadsheet_id": self.spreadsheet_id, "sheets": sheets}))
+        except OSError:
+            logger.warning(f"Could not write sheet cache to {path}", exc_info=True)
+
+    def clear(self) -> None:
+        """Forget every saved year, e.g. after the sheets were written outside the saved state"""
+        for path in self.cache_dir.glob("state-*.json"):
+            path.unlink(missing_ok=True)
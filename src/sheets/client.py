@@ -1,19 +1,117 @@
 import json
 import logging
 import os
+import re
 from collections.abc import Generator
-from datetime import UTC, date, datetime, timedelta
+from datetime import UTC, date, datetime
+from functools import lru_cache
 from typing import ClassVar
 
+import google_auth_httplib2
+import httplib2
 from google.api_core import retry
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 
+from .cache_store import CacheStore
 from .models import EntryType
 
 
 logger = logging.getLogger(__name__)
 
+# spelled out rather than strftime("%A, %B %-d"), which is slower and follows the process locale
+WEEKDAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+MONTH_NAMES = (
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+)
+# the whole first row, however many activity columns it has
+HEADER_RANGE = "1:1"
+# an A1 range starting in row 1, e.g. "A1:C1", "B1" or "1:1"
+_HEADER_CELL = re.compile(r"[A-Z]*1(?!\d)")
+# partial-response masks, reads only ever use the cell values
+VALUES_FIELDS = "values"
+BATCH_VALUES_FIELDS = "valueRanges(values)"
+
+
+# a sheet only ever holds one year of dates, so a small cache spares strftime on every lookup
+@lru_cache(maxsize=1024)
+def format_sheet_date(value: date) -> str:
+    """Format a date the way it appears in column A of an activity sheet"""
+    return f"{WEEKDAY_NAMES[value.weekday()]}, {MONTH_NAMES[value.month - 1]} {value.day}"
+
+
+@lru_cache(maxsize=256)
+def column_letter(index: int) -> str:
+    """Convert a zero-based column index to its A1 column letters (0 -> A, 26 -> AA)"""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+@lru_cache(maxsize=4)
+def year_structure(year: int) -> tuple[tuple[EntryType, str], ...]:
+    """Every entry of column A for a year: a week header before each ISO week, then its dates"""
+    entries = []
+    first_ordinal = date(year, 1, 1).toordinal()
+    for ordinal in range(first_ordinal, date(year + 1, 1, 1).toordinal()):
+        current_date = date.fromordinal(ordinal)
+        # ISO weeks start on Monday, so the week number only needs computing there
+        if ordinal == first_ordinal or current_date.weekday() == 0:
+            entries.append((EntryType.WEEK_HEADER, f"Week {current_date.isocalendar()[1]}"))
+        entries.append((EntryType.DATE, format_sheet_date(current_date)))
+    return tuple(entries)
+
+
+@lru_cache(maxsize=4)
+def year_date_rows(year: int) -> dict[str, int]:
+    """Map every column A entry of a freshly written year to the first row it appears in, as a read would"""
+    date_rows = {"Date": 1}
+    # a week header can repeat, e.g. "Week 1" at both ends of the year, and the first row wins as on a read
+    for row, (_, label) in enumerate(year_structure(year), start=2):
+        date_rows.setdefault(label, row)
+    return date_rows
+
+
+# a year spans ~430 rows and the width only grows when an activity is added, so ranges repeat
+@lru_cache(maxsize=1024)
+def row_range(row_index: int, width: int) -> str:
+    """A1 range covering the first width cells of a row"""
+    return f"A{row_index}:{column_letter(max(width, 1) - 1)}{row_index}"
+
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def _is_retryable(exc: Exception) -> bool:
+    """Retry rate limiting and server errors, which the client methods wrap in SheetError"""
+    cause = exc.__cause__ if isinstance(exc, SheetError) else exc
+    return isinstance(cause, HttpError) and cause.resp.status in RETRYABLE_STATUSES
+
+
+# exponential backoff with jitter, giving up after 30s so a message isn't held indefinitely
+_RETRY = retry.Retry(predicate=_is_retryable, initial=0.5, maximum=8.0, multiplier=2.0, timeout=30.0)
+
+
+@lru_cache(maxsize=4)
+def _service_account_credentials(creds_json: str, scopes: tuple[str, ...]) -> service_account.Credentials:
+    """Parse a service account key once, so every client using it shares one auto-refreshing token"""
+    return service_account.Credentials.from_service_account_info(json.loads(creds_json), scopes=list(scopes))
+
 
 class SheetError(Exception):
     """Custom exception for sheet-related errors"""
@@ -23,21 +121,30 @@ class GoogleSheetsClient:
     """Handles all Google Sheets operations"""
 
     SCOPES: ClassVar = ["https://www.googleapis.com/auth/spreadsheets"]
-    BATCH_SIZE = 50
+    HTTP_TIMEOUT = 30
 
     def __init__(
         self,
         spreadsheet_id: str,
+        cache_store: CacheStore | None = None,
     ) -> None:
         """
         Initialize the SheetsClient with the given spreadsheet ID.
 
         Args:
             spreadsheet_id (str): The ID of the spreadsheet to interact with.
+            cache_store (CacheStore | None): Where to persist sheet structure across restarts, if anywhere.
 
         """
         self.spreadsheet_id = spreadsheet_id
+        self.cache_store = cache_store
         self.service = self._build_sheets_service()
+        # per-sheet header and column A lookups, dropped whenever this client changes them
+        self._activity_columns: dict[str, list[str]] = {}
+        self._date_rows: dict[str, dict[str, int]] = {}
+        # the year and sheets last initialized, whose structure the cache store holds
+        self._initialized_year: int | None = None
+        self._initialized_sheets: list[str] = []
 
     def _load_google_credentials(self):
         creds_json = os.getenv("GOOGLE_CREDENTIALS")
@@ -48,8 +155,7 @@ class GoogleSheetsClient:
     def _get_google_credentials(self):
         try:
             creds_json = self._load_google_credentials()
-            creds_dict = json.loads(creds_json)
-            return service_account.Credentials.from_service_account_info(creds_dict, scopes=self.SCOPES)
+            return _service_account_credentials(creds_json, tuple(self.SCOPES))
         except json.JSONDecodeError as e:
             raise ValueError("GOOGLE_CREDENTIALS environment variable contains invalid JSON") from e
         except ValueError as e:
@@ -63,7 +169,11 @@ class GoogleSheetsClient:
         """Create and return an authorized Sheets API service object"""
         try:
             creds = self._get_google_credentials()
-            return build("sheets", "v4", credentials=creds)
+            # one authorized transport for the client's lifetime, so its kept-alive connection
+            # to sheets.googleapis.com is reused by every request instead of re-handshaking
+            http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http(timeout=self.HTTP_TIMEOUT))
+            # the discovery document ships with google-api-python-client, so no request is made for it
+            return build("sheets", "v4", http=http, static_discovery=True)
         # ruff doesn't like bare exception here,
         # but I do
         # ruff: noqa: TRY002
@@ -73,84 +183,177 @@ class GoogleSheetsClient:
 
     def initialize_year_structure(self, sheet_name: str, year: int | None = None, *, force: bool = False) -> None:
         """Initialize the spreadsheet with all weeks and days of the year."""
+        self.initialize_year_structures([sheet_name], year, force=force)
+
+    def initialize_year_structures(
+        self, sheet_names: list[str], year: int | None = None, *, force: bool = False
+    ) -> None:
+        """Initialize several sheets with all weeks and days of the year, one request per step for all of them"""
         year = year or datetime.now(tz=UTC).year
         logger.info(f"Initializing year structure for {year}")
+        expected_dates = [date_str for _, date_str in self._generate_dates(year)]
 
-        if not force:
-            current_dates = self.get_current_dates(sheet_name=sheet_name)
-            date_gen = self._generate_dates(year)
-            expected_dates = [date_str for _, date_str in date_gen]
-
-            if self._validate_current_structure(current_dates, expected_dates):
-                logger.info("Sheet is already properly initialized")
-                return
+        self._initialized_year = year
+        self._initialized_sheets = list(sheet_names)
+        if not force and self._restore_cached_structure(sheet_names, year):
+            logger.info("Sheets were initialized recently, using the saved structure")
+            return
 
-        self._perform_initialization(sheet_name, year)
+        stale_sheets = list(sheet_names)
+        if not force:
+            current_dates = self.get_current_dates_for_sheets(sheet_names)
+            stale_sheets = [
+                sheet_name
+                for sheet_name in sheet_names
+                if not self._validate_current_structure(current_dates[sheet_name], expected_dates)
+            ]
+
+        if stale_sheets:
+            self._perform_initialization(stale_sheets, year, expected_dates)
+        else:
+            logger.info("Sheets are already properly initialized")
+        self._save_cached_structure()
+
+    def _restore_cached_structure(self, sheet_names: list[str], year: int) -> bool:
+        """Fill the header and column A caches from the cache store, if it holds every sheet"""
+        saved = self.cache_store.load(year) if self.cache_store else None
+        if not saved or not all(sheet_name in saved for sheet_name in sheet_names):
+            return False
+        for sheet_name in sheet_names:
+            self._activity_columns[sheet_name] = saved[sheet_name]["activity_columns"]
+            self._date_rows[sheet_name] = saved[sheet_name]["date_rows"]
+        return True
+
+    def _save_cached_structure(self) -> None:
+        """Persist the header and column A caches of the initialized sheets"""
+        if self.cache_store is None or self._initialized_year is None:
+            return
+        if not all(
+            sheet_name in self._activity_columns and sheet_name in self._date_rows
+            for sheet_name in self._initialized_sheets
+        ):
+            self.cache_store.clear()
+            return
+        self.cache_store.save(
+            self._initialized_year,
+            {
+                sheet_name: {
+                    "activity_columns": self._activity_columns[sheet_name],
+                    "date_rows": self._date_rows[sheet_name],
+                }
+                for sheet_name in self._initialized_sheets
+            },
+        )
+
+    def set_activity_columns(self, sheet_name: str, activities: list[str]) -> None:
+        """Record a header written through batch_update, keeping the cached and persisted copies current"""
+        self._activity_columns[sheet_name] = list(activities)
+        if sheet_name in self._initialized_sheets:
+            self._save_cached_structure()
+
+    def invalidate_cached_structure(self) -> None:
+        """Drop the persisted structure, e.g. after a write whose outcome is unknown"""
+        if self.cache_store is not None:
+            self.cache_store.clear()
 
     def _generate_dates(self, year: int) -> Generator[tuple[EntryType, str], None, None]:
         """Generate sequence of dates and week headers for the year"""
-        current_date = datetime(year, 1, 1, tzinfo=UTC)
-        current_week = None
-
-        while current_date.year == year:
-            week_number = current_date.isocalendar()[1]
-
-            if week_number != current_week:
-                yield EntryType.WEEK_HEADER, f"Week {week_number}"
-                current_week = week_number
-
-            yield EntryType.DATE, current_date.strftime("%A, %B %-d")
-            current_date += timedelta(days=1)
-
-    @retry.Retry()
-    def get_current_dates(self, sheet_name: str) -> list[str]:
-        """Get the current content of column A with retry logic"""
-        range_name = f"{sheet_name}!A:A"
+        yield from year_structure(year)
+
+    @_RETRY
+    def get_current_dates_for_sheets(self, sheet_names: list[str]) -> dict[str, list[str]]:
+        """Get the current content of column A for several sheets in a single request"""
+        # the header rows ride along, so neither column A nor the header needs its own read later
+        ranges = [
+            qualified_range
+            for sheet_name in sheet_names
+            for qualified_range in (f"{sheet_name}!A:A", f"{sheet_name}!{HEADER_RANGE}")
+        ]
         try:
             result = (
-                self.service.spreadsheets().values().get(spreadsheetId=self.spreadsheet_id, range=range_name).execute()
+                self.service.spreadsheets()
+                .values()
+                .batchGet(spreadsheetId=self.spreadsheet_id, ranges=ranges, fields=BATCH_VALUES_FIELDS)
+                .execute()
             )
-            return [row[0] for row in result.get("values", [])[1:] if row]
         except Exception as e:
             logger.exception("Error reading current dates")
             raise SheetError(f"Failed to read current dates: {e!s}") from e
 
-    @retry.Retry()
+        value_ranges = result.get("valueRanges", [])
+        current_dates = {}
+        for sheet_name, column_range, header_range in zip(
+            sheet_names, value_ranges[::2], value_ranges[1::2], strict=True
+        ):
+            column = column_range.get("values", [])
+            headers = header_range.get("values", [[]])[0]
+            self._date_rows[sheet_name] = self._index_date_rows(column)
+            self._activity_columns[sheet_name] = headers[1:]
+            current_dates[sheet_name] = [row[0] for row in column[1:] if row]
+        return current_dates
+
     def clear_sheet(self, sheet_name: str) -> None:
         """Clear all content from sheet with retry logic"""
-        clear_range = f"{sheet_name}!A1:Z1000"
+        self.clear_sheets([sheet_name])
+
+    @_RETRY
+    def clear_sheets(self, sheet_names: list[str]) -> None:
+        """Clear all content from several sheets in a single request"""
+        clear_ranges = [self._used_range(sheet_name) for sheet_name in sheet_names]
         try:
             self.service.spreadsheets().values().batchClear(
-                spreadsheetId=self.spreadsheet_id, body={"ranges": [clear_range]}
+                spreadsheetId=self.spreadsheet_id, body={"ranges": clear_ranges}
             ).execute()
         except Exception as e:
             logger.exception("Error clearing sheet")
             raise SheetError(f"Failed to clear sheet: {e!s}") from e
+        # dropped only once the clear went through, so a retry clears the same used range
+        for sheet_name in sheet_names:
+            self._activity_columns.pop(sheet_name, None)
+            self._date_rows.pop(sheet_name, None)
+
+    def _used_range(self, sheet_name: str) -> str:
+        """Return the range holding the sheet's content per the cached reads, or the whole sheet if nothing is cached"""
+        if sheet_name not in self._date_rows or sheet_name not in self._activity_columns:
+            return sheet_name
+        last_row = max(self._date_rows[sheet_name].values(), default=1)
+        return f"{sheet_name}!A1:{column_letter(len(self._activity_columns[sheet_name]))}{last_row}"
 
     def _validate_current_structure(self, current: list[str], expected: list[str]) -> bool:
         """Validate if current sheet structure matches expected structure"""
         return len(current) == len(expected) and all(curr == exp for curr, exp in zip(current, expected, strict=False))
 
-    def _perform_initialization(self, sheet_name: str, year: int) -> None:
-        """Perform the actual initialization of the sheet"""
-        logger.info("Starting sheet initialization")
-        self.clear_sheet(sheet_name=sheet_name)
-        self.update_header_row(sheet_name=sheet_name)
-
-        batch = []
-        for _entry_type, value in self._generate_dates(year):
-            batch.append([value])
+    def _perform_initialization(self, sheet_names: list[str], year: int, expected_dates: list[str]) -> None:
+        """Perform the actual initialization of the sheets, writing header and dates in one request"""
+        logger.info(f"Starting sheet initialization for {sheet_names}")
+        self.clear_sheets(sheet_names)
 
-            if len(batch) >= self.BATCH_SIZE:
-                self.append_to_sheet_formatted(sheet_name, batch)
-                batch = []
+        rows = [["Date"], *([date_str] for date_str in expected_dates)]
+        self._write_year_structure(sheet_names, rows)
 
-        if batch:  # Don't forget remaining entries
-            self.append_to_sheet_formatted(sheet_name, batch)
+        # the layout just written is the year's, so each row follows from its position without re-indexing
+        date_rows = year_date_rows(year)
+        for sheet_name in sheet_names:
+            self._activity_columns[sheet_name] = []
+            self._date_rows[sheet_name] = dict(date_rows)
 
         logger.info("Sheet initialization completed successfully")
 
-    @retry.Retry()
+    @_RETRY
+    def _write_year_structure(self, sheet_names: list[str], rows: list[list[str]]) -> None:
+        """Write the header and column A rows to every sheet in a single request"""
+        # RAW keeps the date labels as text, USER_ENTERED would turn them into date values
+        data = [{"range": f"{sheet_name}!A1:A{len(rows)}", "values": rows} for sheet_name in sheet_names]
+        try:
+            self.service.spreadsheets().values().batchUpdate(
+                spreadsheetId=self.spreadsheet_id,
+                body={"valueInputOption": "RAW", "data": data},
+            ).execute()
+        except Exception as e:
+            logger.exception("Error initializing sheets")
+            raise SheetError(f"Failed to initialize sheets {sheet_names}: {e!s}") from e
+
+    # not retried: an append that timed out or hit a 5xx may still have landed, and a retry would duplicate rows
     def append_to_sheet_formatted(self, sheet_name: str, values: list[list[str]]) -> None:
         """Append rows to the sheet with retry logic"""
         try:
@@ -165,92 +368,77 @@ class GoogleSheetsClient:
             logger.exception("Error appending to sheet")
             raise SheetError(f"Failed to append to sheet: {e!s}") from e
 
-    @retry.Retry()
     def get_date_row_index(self, sheet_name: str, date: date) -> int | None:
         """Find the row index for a given date"""
-        date_str = date.strftime("%A, %B %-d")
+        if sheet_name not in self._date_rows:
+            self._date_rows[sheet_name] = self._read_date_rows(sheet_name)
+        return self._date_rows[sheet_name].get(format_sheet_date(date))
+
+    @_RETRY
+    def _read_date_rows(self, sheet_name: str) -> dict[str, int]:
+        """Map every value in column A to the first row it appears in"""
         range_name = f"{sheet_name}!A:A"
         try:
             result = (
-                self.service.spreadsheets().values().get(spreadsheetId=self.spreadsheet_id, range=range_name).execute()
+                self.service.spreadsheets()
+                .values()
+                .get(spreadsheetId=self.spreadsheet_id, range=range_name, fields=VALUES_FIELDS)
+                .execute()
             )
-
-            if "values" in result:
-                for i, row in enumerate(result["values"]):
-                    if row and row[0] == date_str:
-                        return i + 1
-            return None
         except Exception as e:
             logger.exception("Error finding date row")
-            raise SheetError(f"Failed to find row for date {date_str}: {e!s}") from e
+            raise SheetError(f"Failed to read date rows: {e!s}") from e
 
-    @retry.Retry()
-    def get_row_values(self, sheet_name: str, row_index: int) -> list[float]:
-        """Get all values for a specific row"""
-        range_name = f"{sheet_name}!{row_index}:{row_index}"
-        try:
-            result = (
-                self.service.spreadsheets().values().get(spreadsheetId=self.spreadsheet_id, range=range_name).execute()
-            )
-            return result.get("values", [[]])[0] if "values" in result else []
-        except Exception as e:
-            logger.exception("Error reading row values")
-            raise SheetError(f"Failed to read row {row_index}: {e!s}") from e
-
-    @retry.Retry()
-    def update_row(self, sheet_name: str, row_index: int, values: list[float]) -> None:
-        """Update an entire row with new values"""
-        range_name = f"{sheet_name}!A{row_index}:{chr(65 + len(values))}{row_index}"
-        try:
-            self.service.spreadsheets().values().update(
-                spreadsheetId=self.spreadsheet_id,
-                range=range_name,
-                valueInputOption="USER_ENTERED",
-                body={"values": [values]},
-            ).execute()
-        except Exception as e:
-            logger.exception("Error updating row")
-            raise SheetError(f"Failed to update row {row_index}: {e!s}") from e
+        return self._index_date_rows(result.get("values", []))
 
     @staticmethod
-    def _ensure_row_length(values: list[float], required_length: int) -> list[float]:
-        """Ensure the row has the required length, padding with zeros if needed"""
-        return values + [0] * (required_length + 1 - len(values))
-
-    @retry.Retry()
-    def update_header_row(self, sheet_name: str, activities: list[str] | None = None) -> None:
-        """Update the header row with given activities"""
-        activities = activities or []
-        header_row = ["Date", *activities]
-        range_name = f"{sheet_name}!A1:{chr(65 + len(header_row))}{1}"
-
+    def _index_date_rows(column: list[list[str]]) -> dict[str, int]:
+        """Map every value in a column A read to the first row it appears in"""
+        date_rows: dict[str, int] = {}
+        for i, row in enumerate(column):
+            if row:
+                date_rows.setdefault(row[0], i + 1)
+        return date_rows
+
+    @_RETRY
+    def batch_update(self, sheet_name: str, updates: dict[str, list[list]]) -> None:
+        """Write several ranges of a sheet in a single request"""
+        data = [{"range": f"{sheet_name}!{range_name}", "values": values} for range_name, values in updates.items()]
         try:
-            self.service.spreadsheets().values().update(
+            self.service.spreadsheets().values().batchUpdate(
                 spreadsheetId=self.spreadsheet_id,
-                range=range_name,
-                valueInputOption="USER_ENTERED",
-                body={"values": [header_row]},
+                body={"valueInputOption": "USER_ENTERED", "data": data},
             ).execute()
         except Exception as e:
-            logger.exception("Error updating header row")
-            raise SheetError(f"Failed to update header row: {e!s}") from e
-
-    def update_activities_header(self, sheet_name: str, activity: str) -> None:
-        """Add a new activity column if it doesn't exist"""
-        existing_activities = self.get_activity_columns(sheet_name=sheet_name)
-        if activity not in existing_activities:
-            logger.info(f"Adding new activity column: {activity}")
-            activities = [*existing_activities, activity]
-            self.update_header_row(sheet_name=sheet_name, activities=activities)
-
-    @retry.Retry()
+            logger.exception("Error batch updating ranges")
+            raise SheetError(f"Failed to update ranges {list(updates)}: {e!s}") from e
+        # only a write to row 1 can change the header; callers that write it should report the new one
+        # through set_activity_columns, otherwise it is re-read on the next get_activity_columns
+        if any(_HEADER_CELL.match(range_name) for range_name in updates):
+            self._activity_columns.pop(sheet_name, None)
+
     def get_activity_columns(self, sheet_name: str) -> list[str]:
         """Get list of activity names from the header row"""
-        range_name = f"{sheet_name}!A1:Z1"
+        if sheet_name not in self._activity_columns:
+            self._activity_columns[sheet_name] = self._read_activity_columns(sheet_name)
+        return list(self._activity_columns[sheet_name])
+
+    def refresh_activity_columns(self, sheet_name: str) -> list[str]:
+        """Re-read the header row, for when it may have been edited on the sheet since it was cached"""
+        self._activity_columns.pop(sheet_name, None)
+        return self.get_activity_columns(sheet_name)
+
+    @_RETRY
+    def _read_activity_columns(self, sheet_name: str) -> list[str]:
+        """Read the activity names from the header row"""
+        range_name = f"{sheet_name}!{HEADER_RANGE}"
 
         try:
             result = (
-                self.service.spreadsheets().values().get(spreadsheetId=self.spreadsheet_id, range=range_name).execute()
+                self.service.spreadsheets()
+                .values()
+                .get(spreadsheetId=self.spreadsheet_id, range=range_name, fields=VALUES_FIELDS)
+                .execute()
             )
 
             if result.get("values"):
@@ -1,5 +1,5 @@
 # src/sheets/models.py
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 
@@ -17,3 +17,27 @@ class EntryType(Enum):
 
     WEEK_HEADER = "WEEK"
     DATE = "DATE"
+
+
+@dataclass
+class SheetState:
+    """The parts of a sheet needed to record a batch of entries, plus the cell writes they produce"""
+
+    activities: list[str]
+    date_rows: dict[str, int]
+    pending_cells: dict[tuple[int, int], float] = field(default_factory=dict)
+    header_changed: bool = False
+    # sheet column of each activity, column 0 being the date
+    activity_columns: dict[str, int] = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Index the header's columns, keeping the first column of a repeated name"""
+        self.activity_columns = {}
+        for index, activity in enumerate(self.activities):
+            self.activity_columns.setdefault(activity, index + 1)
+
+    def add_activity(self, activity: str) -> None:
+        """Append an activity to the header and index its column"""
+        self.activities.append(activity)
+        self.activity_columns[activity] = len(self.activities)
+        self.header_changed = True
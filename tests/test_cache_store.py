@@ -0,0 +1,44 @@
+import os
+import time
+from pathlib import Path
+
+from src.sheets.cache_store import CacheStore
+
+
+SHEETS = {"Me": {"activity_columns": ["Running"], "date_rows": {"Date": 1, "Week 1": 2}}}
+
+
+def test_round_trip(tmp_path: Path) -> None:
+    """A saved year loads back for the same spreadsheet"""
+    store = CacheStore("sheet-a", cache_dir=tmp_path)
+    store.save(2026, SHEETS)
+    assert store.load(2026) == SHEETS
+    assert store.load(2025) is None
+
+
+def test_other_spreadsheet_is_ignored(tmp_path: Path) -> None:
+    """State saved for one spreadsheet is never used for another sharing the directory"""
+    CacheStore("sheet-a", cache_dir=tmp_path).save(2026, SHEETS)
+    assert CacheStore("sheet-b", cache_dir=tmp_path).load(2026) is None
+
+
+def test_stale_state_expires(tmp_path: Path) -> None:
+    """State older than max_age_seconds is treated as missing"""
+    store = CacheStore("sheet-a", cache_dir=tmp_path, max_age_seconds=60)
+    store.save(2026, SHEETS)
+    path = next(tmp_path.glob("state-*.json"))
+    an_hour_ago = time.time() - 3600
+    os.utime(path, (an_hour_ago, an_hour_ago))
+    assert store.load(2026) is None
+
+
+def test_corrupt_file_and_clear(tmp_path: Path) -> None:
+    """An unreadable file loads as missing, and clear forgets every year"""
+    store = CacheStore("sheet-a", cache_dir=tmp_path)
+    (tmp_path / "state-2025.json").write_text("{not json")
+    assert store.load(2025) is None
+
+    store.save(2026, SHEETS)
+    store.clear()
+    assert store.load(2026) is None
+    assert not list(tmp_path.glob("state-*.json"))
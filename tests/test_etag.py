@@ -0,0 +1,37 @@
+import pytest
+
+from src.api.etag import etag_matches
+
+
+ETAG = '"0123456789abcdef"'
+
+
+@pytest.mark.parametrize(
+    "if_none_match",
+    [
+        ETAG,
+        f"W/{ETAG}",
+        f'"other", {ETAG}',
+        f'W/"other",W/{ETAG}',
+        "*",
+    ],
+)
+def test_matching_header(if_none_match: str) -> None:
+    """The current tag matches alone, weakly, inside a list, or through *"""
+    assert etag_matches(if_none_match, ETAG)
+
+
+@pytest.mark.parametrize(
+    "if_none_match",
+    [
+        None,
+        "",
+        '"other"',
+        'W/"other", "another"',
+        ETAG.strip('"'),
+        f'"{ETAG}"',
+    ],
+)
+def test_non_matching_header(if_none_match: str | None) -> None:
+    """A missing header, other tags or an unquoted tag get the full response"""
+    assert not etag_matches(if_none_match, ETAG)
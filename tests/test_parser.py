@@ -0,0 +1,63 @@
+from datetime import date
+
+import orjson
+import pytest
+
+from src.activities.parser import OpenAIActivityParser
+
+
+TODAY = date(2026, 1, 2)
+
+
+@pytest.fixture
+def parser() -> OpenAIActivityParser:
+    """Build a parser whose client these tests never call"""
+    return OpenAIActivityParser(api_key="test-key", confidence_threshold=0.7)
+
+
+def _reply(*activities: dict) -> str:
+    return orjson.dumps({"activities": list(activities)}).decode()
+
+
+def _activity(**fields: object) -> dict:
+    return {
+        "activity": "Running",
+        "duration": 0.5,
+        "confidence": 1.0,
+        "matched_category": None,
+        "days_ago": None,
+        "date": None,
+    } | fields
+
+
+@pytest.mark.parametrize(
+    ("fields", "expected"),
+    [
+        ({"days_ago": 0}, TODAY),
+        ({}, TODAY),
+        ({"days_ago": 2}, date(2025, 12, 31)),
+        ({"date": "01/09"}, date(2026, 1, 9)),
+        ({"date": "12/30"}, date(2026, 12, 30)),
+    ],
+)
+def test_dates_resolve_against_today(parser: OpenAIActivityParser, fields: dict, expected: date) -> None:
+    """Relative dates count back from today and explicit MM/DD dates fall in the current year"""
+    [activity] = parser._process_response(_reply(_activity(**fields)), current_date=TODAY)  # noqa: SLF001
+    assert activity["date"] == expected
+
+
+def test_invalid_date_drops_only_that_activity(parser: OpenAIActivityParser) -> None:
+    """02/29 outside a leap year is skipped while the rest of the reply is kept"""
+    reply = _reply(_activity(activity="Yoga", date="02/29"), _activity(days_ago=0))
+    activities = parser._process_response(reply, current_date=TODAY)  # noqa: SLF001
+    assert activities == [{"activity": "Running", "duration": 0.5, "date": TODAY}]
+
+
+def test_confident_match_uses_existing_category(parser: OpenAIActivityParser) -> None:
+    """A match above the confidence threshold takes the existing category's name"""
+    reply = _reply(
+        _activity(activity="jog", matched_category="Running", confidence=0.9),
+        _activity(activity="Guitar", matched_category="Piano", confidence=0.2),
+    )
+    activities = parser._process_response(reply, current_date=TODAY)  # noqa: SLF001
+    assert [activity["activity"] for activity in activities] == ["Running", "Guitar"]
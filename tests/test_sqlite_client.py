@@ -0,0 +1,80 @@
+import sqlite3
+from datetime import date
+from pathlib import Path
+
+from src.db.client import SCHEMA_VERSION, SQLiteClient
+
+
+def _create_legacy_database(data_dir_path: Path, dates: list[str]) -> Path:
+    """Create a database as it was before entry dates were stored as ordinals"""
+    database_path = data_dir_path / "db" / "higher-pleasures.db"
+    database_path.parent.mkdir(parents=True)
+    connection = sqlite3.connect(database_path)
+    connection.executescript("""
+        CREATE TABLE users (
+            user_id TEXT PRIMARY KEY,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            email TEXT,
+            cell TEXT NOT NULL,
+            telegram_id INTEGER NOT NULL,
+            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE activities (
+            user_activity_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            activity TEXT NOT NULL,
+            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE entries (
+            entry_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            user_activity_id INTEGER NOT NULL,
+            date DATE NOT NULL,
+            duration_minutes INTEGER NOT NULL,
+            raw_input TEXT NOT NULL,
+            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+        INSERT INTO users (user_id, first_name, last_name, cell, telegram_id) VALUES ('u1', 'A', 'B', '+1', 42);
+        INSERT INTO activities (user_id, activity) VALUES ('u1', 'Running');
+    """)
+    connection.executemany(
+        "INSERT INTO entries (user_id, user_activity_id, date, duration_minutes, raw_input) VALUES ('u1', 1, ?, 30, 'ran')",
+        [(value,) for value in dates],
+    )
+    connection.commit()
+    connection.close()
+    return database_path
+
+
+def test_text_dates_are_converted_to_ordinals(tmp_path: Path) -> None:
+    """ISO date strings from an old database come back as the same dates"""
+    dates = ["0001-01-01", "2024-02-29", "2025-12-31", "2026-01-01"]
+    database_path = _create_legacy_database(tmp_path, dates)
+
+    client = SQLiteClient(data_dir_path=tmp_path)
+    try:
+        assert [entry["date"] for entry in client.get_entries()] == [date.fromisoformat(value) for value in dates]
+    finally:
+        client.close()
+
+    connection = sqlite3.connect(database_path)
+    stored = connection.execute("SELECT typeof(date), date FROM entries ORDER BY entry_id").fetchall()
+    user_version = connection.execute("PRAGMA user_version").fetchone()[0]
+    connection.close()
+    assert stored == [("integer", date.fromisoformat(value).toordinal()) for value in dates]
+    assert user_version == SCHEMA_VERSION
+
+
+def test_converted_dates_survive_a_restart(tmp_path: Path) -> None:
+    """Reopening a converted database leaves its ordinals and new entries alone"""
+    _create_legacy_database(tmp_path, ["2026-03-01"])
+    SQLiteClient(data_dir_path=tmp_path).close()
+
+    client = SQLiteClient(data_dir_path=tmp_path)
+    try:
+        client.insert_entry("u1", 1, date(2026, 3, 2), 15, "ran again")
+        assert [entry["date"] for entry in client.get_user_entries("u1")] == [date(2026, 3, 1), date(2026, 3, 2)]
+        assert client.get_activity_minutes_on_date("u1", 1, date(2026, 3, 1)) == 30
+    finally:
+        client.close()
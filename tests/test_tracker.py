@@ -0,0 +1,66 @@
+from src.activities.tracker import ActivityTracker
+from src.sheets.models import SheetState
+
+
+class FakeSheetsClient:
+    """Records what the tracker writes, with a header that may have been edited by hand"""
+
+    spreadsheet_id = "test-spreadsheet"
+
+    def __init__(self, header: list[str]) -> None:
+        self.header = header
+        self.updates: list[dict] = []
+        self.reported_header: list[str] | None = None
+
+    def initialize_year_structures(self, _sheet_names: list[str], _year: int) -> None:
+        """Skip initialization, the sheet's rows are given to each test's state"""
+
+    def refresh_activity_columns(self, _sheet_name: str) -> list[str]:
+        """Return the header as it is on the sheet now"""
+        return list(self.header)
+
+    def batch_update(self, _sheet_name: str, updates: dict) -> None:
+        """Record a write"""
+        self.updates.append(updates)
+
+    def set_activity_columns(self, _sheet_name: str, activities: list[str]) -> None:
+        """Record the header the tracker reports after writing it"""
+        self.reported_header = list(activities)
+
+
+def _tracker(sheets_client: FakeSheetsClient) -> ActivityTracker:
+    return ActivityTracker(
+        sheets_client=sheets_client,
+        activity_parser=None,
+        user_sheet_mapping={42: "Me"},
+        db_client=None,
+        year=2026,
+    )
+
+
+def test_cells_follow_columns_moved_by_hand() -> None:
+    """Day totals land under their activity after someone reorders and inserts columns"""
+    sheets_client = FakeSheetsClient(header=["Manual", "Reading", "Running"])
+    state = SheetState(activities=["Running", "Reading"], date_rows={"Friday, January 2": 5})
+    state.pending_cells = {(5, 1): 1.0, (5, 2): 2.0}
+
+    _tracker(sheets_client)._flush_sheet_state("Me", state)  # noqa: SLF001
+
+    assert sheets_client.updates == [{"C5": [[2.0]], "D5": [[1.0]]}]
+    assert sheets_client.reported_header is None
+    assert state.activities == ["Manual", "Reading", "Running"]
+
+
+def test_new_activity_keeps_hand_added_columns() -> None:
+    """A new activity is appended after columns added on the sheet since the header was cached"""
+    sheets_client = FakeSheetsClient(header=["Running", "Manual"])
+    state = SheetState(activities=["Running"], date_rows={"Friday, January 2": 5})
+    state.add_activity("Swimming")
+    state.pending_cells = {(5, 1): 1.0, (5, 2): 0.5}
+
+    _tracker(sheets_client)._flush_sheet_state("Me", state)  # noqa: SLF001
+
+    assert sheets_client.updates == [
+        {"A1:D1": [["Date", "Running", "Manual", "Swimming"]], "B5": [[1.0]], "D5": [[0.5]]}
+    ]
+    assert sheets_client.reported_header == ["Running", "Manual", "Swimming"]